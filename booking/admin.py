@@ -1,4 +1,52 @@
+from django import forms
 from django.contrib import admin
-from .models import Bookings
-# Register your models here.
-admin.site.register(Bookings)
+from django.core.exceptions import ValidationError
+from .inventory import inventory
+from .models import Bookings, BookingStats, SeatShard
+
+
+class BookingsAdminForm(forms.ModelForm):
+    class Meta:
+        model = Bookings
+        fields = ('student', 'year', 'attended', 'attended_at')
+
+    def clean(self):
+        cleaned = super().clean()
+        if self.instance.pk is None and cleaned.get('year') and inventory.remaining(cleaned['year']) <= 0:
+            raise ValidationError('No seats left for this year.')
+        return cleaned
+
+
+@admin.register(Bookings)
+class BookingsAdmin(admin.ModelAdmin):
+    """Bookings added here take a seat from the inventory like the booking endpoint."""
+    form = BookingsAdminForm
+    list_display = ('student', 'year', 'attended', 'registered_on', 'shard')
+    list_filter = ('year', 'attended')
+    search_fields = ('student__moodleID', 'student__username')
+    readonly_fields = ('shard',)
+
+    def get_readonly_fields(self, request, obj=None):
+        # moving a booking between pools would leave the shard counters behind
+        return ('year', 'shard') if obj is not None else self.readonly_fields
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            # the admin view runs in a transaction, so this rolls back with a failed save
+            obj.shard_id = inventory.claim(obj.year)
+            if obj.shard_id is None:
+                raise ValidationError('No seats left for this year.')
+        super().save_model(request, obj, form, change)
+
+
+@admin.register(SeatShard)
+class SeatShardAdmin(admin.ModelAdmin):
+    list_display = ('year', 'shard', 'capacity', 'booked')
+    list_filter = ('year',)
+    ordering = ('year', 'shard')
+
+
+@admin.register(BookingStats)
+class BookingStatsAdmin(admin.ModelAdmin):
+    list_display = ('key', 'capacity', 'booked', 'remaining', 'attended')
+    readonly_fields = ('key', 'capacity', 'booked', 'attended')
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class BookingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'booking'
+
+    def ready(self):
+        # build the pooled Redis client once per process instead of per request
+        from .utils import init_redis_client
+        init_redis_client()
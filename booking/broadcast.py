@@ -0,0 +1,104 @@
+"""Coalesced seat-count broadcasts for ``BookingConsumer``.
+
+Views call ``broadcaster.publish(remaining)`` after every booking change. The
+call only records the latest value; a flush on an event loop sends at most one
+``count.update`` per ``BOOKING_BROADCAST_INTERVAL`` seconds, always carrying the
+newest count. Socket fan-out therefore stays bounded however fast bookings
+arrive, and the request thread never waits on the channel layer.
+
+Flushes run on the ASGI server's loop once a consumer has attached it, and on
+a private background loop otherwise (e.g. under WSGI).
+"""
+import asyncio
+import threading
+from django.conf import settings
+from channels.layers import get_channel_layer
+
+
+class RemainingBroadcaster:
+
+    def __init__(self, group_name='booking_updates', interval=None):
+        self.group_name = group_name
+        self.interval = interval if interval is not None else getattr(settings, 'BOOKING_BROADCAST_INTERVAL', 0.2)
+        self._lock = threading.Lock()
+        self._latest = None
+        self._pending = False
+        self._last_sent = 0.0
+        self._loop = None
+        self._thread = None
+
+    def publish(self, remaining):
+        """Record ``remaining`` and make sure a flush is scheduled. Thread-safe."""
+        with self._lock:
+            self._latest = remaining
+            if self._pending and self._loop_alive():
+                return
+            self._pending = True
+            loop = self._get_loop()
+        loop.call_soon_threadsafe(self._schedule_flush)
+
+    async def apublish(self, remaining):
+        """Publish from an async view.
+
+        Does not attach: under WSGI each async view runs on a short-lived
+        ``async_to_sync`` loop and a flush scheduled there would be lost when
+        it closes. Flushes stay on the loop a consumer attached, or the
+        private one.
+        """
+        self.publish(remaining)
+
+    def attach(self):
+        """Run flushes on the calling coroutine's loop.
+
+        Only call this from long-lived server code (``BookingConsumer.connect``).
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._loop is loop or (self._thread is None and self._loop_alive()):
+                return
+            private = self._loop if self._thread is not None else None
+            self._loop, self._thread = loop, None
+            reschedule = self._pending
+        if private is not None:
+            private.call_soon_threadsafe(private.stop)
+        if reschedule:
+            loop.call_soon(self._schedule_flush)
+
+    def _loop_alive(self):
+        if self._loop is None or self._loop.is_closed():
+            return False
+        if self._thread is not None:
+            return self._thread.is_alive()
+        return self._loop.is_running()
+
+    def _get_loop(self):
+        # caller holds self._lock
+        if not self._loop_alive():
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._loop.run_forever, name='booking-broadcaster', daemon=True
+            )
+            self._thread.start()
+        return self._loop
+
+    def _schedule_flush(self):
+        loop = asyncio.get_running_loop()
+        delay = max(0.0, self._last_sent + self.interval - loop.time())
+        loop.call_later(delay, lambda: loop.create_task(self._flush()))
+
+    async def _flush(self):
+        with self._lock:
+            remaining = self._latest
+            self._pending = False
+        self._last_sent = asyncio.get_running_loop().time()
+        try:
+            await get_channel_layer().group_send(self.group_name, {
+                'type': 'count.update',
+                'remaining': remaining,
+            })
+        except Exception:
+            # Swallow channel errors; booking correctness relies on DB
+            pass
+
+
+broadcaster = RemainingBroadcaster()
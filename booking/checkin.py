@@ -0,0 +1,97 @@
+"""Batch check-in for gate scanners.
+
+Scanner devices queue scans while offline and flush them here in one request.
+All valid scans are applied with a single ``UPDATE ... WHERE student_id IN
+(...)`` and every scanned moodleID gets its own result so the device can clear
+its queue.
+"""
+from django.db import transaction
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import Bookings, BookingStats
+
+CHECKED_IN = 'checked_in'
+ALREADY_CHECKED_IN = 'already_checked_in'
+NOT_BOOKED = 'not_booked'
+INVALID = 'invalid'
+
+
+def _parse_scan(scan, now):
+    """Return ``(moodleID, scanned_at)`` or ``(raw_id, None)`` for a bad entry."""
+    if not isinstance(scan, dict):
+        scan = {'moodleID': scan}
+    raw_id = scan.get('moodleID')
+    try:
+        moodle_id = int(raw_id)
+    except (TypeError, ValueError):
+        return raw_id, None
+
+    scanned_at = scan.get('scanned_at')
+    if scanned_at is None:
+        return moodle_id, now
+    try:
+        parsed = parse_datetime(str(scanned_at))
+    except ValueError:
+        # well formed but out of range, e.g. month 13
+        return raw_id, None
+    if parsed is None:
+        return raw_id, None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    # device clocks drift; never record a scan in the future
+    return moodle_id, min(parsed, now)
+
+
+def bulk_check_in(scans):
+    """Check in every scanned student. Returns a list of per-scan results."""
+    now = timezone.now()
+    results = []
+    first_scan = {}
+    for scan in scans:
+        moodle_id, scanned_at = _parse_scan(scan, now)
+        if scanned_at is None:
+            results.append({'moodleID': moodle_id, 'status': INVALID})
+            continue
+        results.append({'moodleID': moodle_id})
+        # repeated scans of one student keep the earliest time
+        if moodle_id not in first_scan or scanned_at < first_scan[moodle_id]:
+            first_scan[moodle_id] = scanned_at
+
+    with transaction.atomic():
+        bookings = {
+            student_id: (attended, year)
+            for student_id, attended, year in Bookings.objects.select_for_update().filter(
+                student_id__in=first_scan
+            ).values_list('student_id', 'attended', 'year')
+        }
+        to_mark = [sid for sid, (attended, _) in bookings.items() if not attended]
+        if to_mark:
+            Bookings.objects.filter(student_id__in=to_mark).update(
+                attended=True,
+                attended_at=Case(
+                    *[When(student_id=sid, then=Value(first_scan[sid])) for sid in to_mark],
+                    output_field=DateTimeField(),
+                ),
+            )
+            by_year = {}
+            for sid in to_mark:
+                year = bookings[sid][1]
+                by_year[year] = by_year.get(year, 0) + 1
+            BookingStats.record_attendance(by_year)
+
+    marked = set(to_mark)
+    seen = set()
+    for result in results:
+        if 'status' in result:
+            continue
+        moodle_id = result['moodleID']
+        if moodle_id not in bookings:
+            result['status'] = NOT_BOOKED
+        elif moodle_id in marked and moodle_id not in seen:
+            result['status'] = CHECKED_IN
+            result['attended_at'] = first_scan[moodle_id].isoformat()
+        else:
+            result['status'] = ALREADY_CHECKED_IN
+        seen.add(moodle_id)
+    return results
@@ -1,15 +1,22 @@
+import asyncio
 import json
+from django.conf import settings
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from asgiref.sync import sync_to_async
+from .broadcast import broadcaster
 from .utils import get_remaining_seats
+from .waiting_room import waiting_room, InvalidQueueToken
 
 
 class BookingConsumer(AsyncJsonWebsocketConsumer):
     group_name = 'booking_updates'
+    queue_task = None
 
     async def connect(self):
         await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.accept()
+        # flush coalesced count updates on the server loop
+        broadcaster.attach()
         # send initial remaining count
         try:
             remaining = await sync_to_async(get_remaining_seats)()
@@ -21,11 +28,41 @@ class BookingConsumer(AsyncJsonWebsocketConsumer):
         })
 
     async def disconnect(self, close_code):
+        if self.queue_task:
+            self.queue_task.cancel()
         await self.channel_layer.group_discard(self.group_name, self.channel_name)
 
     async def receive_json(self, content, **kwargs):
-        # No client messages expected for this consumer; ignore.
-        return
+        # {"action": "watch_queue", "token": ...} streams waiting-room positions
+        if content.get('action') != 'watch_queue':
+            return
+        try:
+            ticket = waiting_room.ticket_for(content.get('token', ''))
+        except InvalidQueueToken:
+            await self.send_json({'event': 'QUEUE_ERROR', 'detail': 'Invalid queue token.'})
+            return
+        if self.queue_task:
+            self.queue_task.cancel()
+        self.queue_task = asyncio.create_task(self.watch_queue(ticket))
+
+    async def watch_queue(self, ticket):
+        interval = getattr(settings, 'BOOKING_QUEUE_POSITION_INTERVAL', 1)
+        while True:
+            try:
+                position = await waiting_room.aposition(ticket)
+            except InvalidQueueToken:
+                # the queue was reset since this token was issued
+                await self.send_json({'event': 'QUEUE_ERROR', 'detail': 'Invalid queue token.'})
+                return
+            await self.send_json({
+                'event': 'QUEUE_POSITION',
+                'ticket': ticket.number,
+                'position': position,
+                'admitted': position == 0,
+            })
+            if position == 0:
+                return
+            await asyncio.sleep(interval)
 
     async def count_update(self, event):
         # handler for type "count.update"
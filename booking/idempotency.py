@@ -0,0 +1,150 @@
+"""Idempotency keys for booking writes.
+
+A client that sends an ``Idempotency-Key`` header gets the first response for
+that key replayed on every retry, without the view (or the database) running
+again. Keys are scoped to the endpoint and the user, and responses are kept in
+Redis with a TTL, or in a per-process LRU when Redis is unavailable.
+
+While the first request is still running the key holds a pending marker, so a
+concurrent duplicate gets 409 instead of racing the original.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from django.conf import settings
+from django.http import JsonResponse
+from rest_framework import status
+from .utils import _aget_redis_client
+
+PENDING = '__pending__'
+PENDING_TTL = 30
+KEY_PREFIX = 'booking:idem:'
+
+
+def _replayable(status_code):
+    # 429/428 from the waiting room must be retried for real
+    return 200 <= status_code < 300 or status_code in (400, 404)
+
+
+class LocalIdempotencyStore:
+    """Bounded in-memory LRU with per-entry expiry."""
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl, nx=False):
+        with self._lock:
+            entry = self._entries.get(key)
+            if nx and entry is not None and entry[1] >= time.monotonic():
+                return False
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class IdempotencyStore:
+
+    def __init__(self):
+        self.local = LocalIdempotencyStore(getattr(settings, 'BOOKING_IDEMPOTENCY_LOCAL_SIZE', 10000))
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'BOOKING_IDEMPOTENCY_TTL', 24 * 60 * 60)
+
+    async def claim(self, key):
+        """Mark ``key`` as in flight. Returns None if claimed, else the stored value."""
+        client = await _aget_redis_client()
+        if client is not None:
+            try:
+                if await client.set(KEY_PREFIX + key, PENDING, ex=PENDING_TTL, nx=True):
+                    return None
+                return await client.get(KEY_PREFIX + key) or PENDING
+            except Exception:
+                pass
+        if self.local.set(key, PENDING, PENDING_TTL, nx=True):
+            return None
+        return self.local.get(key) or PENDING
+
+    async def store(self, key, value):
+        client = await _aget_redis_client()
+        if client is not None:
+            try:
+                await client.set(KEY_PREFIX + key, value, ex=self.ttl)
+                return
+            except Exception:
+                pass
+        self.local.set(key, value, self.ttl)
+
+    async def release(self, key):
+        client = await _aget_redis_client()
+        if client is not None:
+            try:
+                await client.delete(KEY_PREFIX + key)
+            except Exception:
+                pass
+        self.local.delete(key)
+
+
+idempotency_store = IdempotencyStore()
+
+
+def idempotent(view):
+    """Replay the stored response for a repeated ``Idempotency-Key``.
+
+    Must sit inside ``async_login_required`` so ``request.user`` is resolved.
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return await view(request, *args, **kwargs)
+
+        scoped = f'{request.path}:{request.user.pk}:{key[:128]}'
+        stored = await idempotency_store.claim(scoped)
+        if stored == PENDING:
+            return JsonResponse(
+                {'detail': 'A request with this Idempotency-Key is already in progress.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+        if stored is not None:
+            saved = json.loads(stored)
+            response = JsonResponse(saved['body'], status=saved['status'])
+            response['Idempotent-Replayed'] = 'true'
+            return response
+
+        try:
+            response = await view(request, *args, **kwargs)
+        except Exception:
+            await idempotency_store.release(scoped)
+            raise
+        if _replayable(response.status_code):
+            await idempotency_store.store(scoped, json.dumps({
+                'status': response.status_code,
+                'body': json.loads(response.content),
+            }))
+        else:
+            await idempotency_store.release(scoped)
+        return response
+    return wrapper
@@ -0,0 +1,140 @@
+"""Sharded seat inventory.
+
+Capacity lives in ``SeatShard`` rows grouped into pools: one pool per year
+that has a quota, plus a shared pool for everyone else. A booking claims a
+seat with a conditional UPDATE on one shard of its pool, starting at a random
+shard so concurrent bookings land on different rows. Remaining capacity is
+the sum of the shard counters, never a COUNT(*) over Bookings; the totals
+are also projected into ``BookingStats`` for single-row reads.
+"""
+import random
+import threading
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from .models import Bookings, BookingStats, SeatShard
+
+SHARED_POOL = ''
+
+
+class SeatInventory:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._layout = None
+
+    # -- layout -----------------------------------------------------------
+    def layout(self, refresh=False):
+        """Return ``{pool: [shard pk, ...]}``, cached per process."""
+        with self._lock:
+            if self._layout is None or refresh:
+                layout = {}
+                for pk, year in SeatShard.objects.order_by('year', 'shard').values_list('pk', 'year'):
+                    layout.setdefault(year, []).append(pk)
+                self._layout = layout
+            return self._layout
+
+    def invalidate(self):
+        with self._lock:
+            self._layout = None
+
+    def pool_for(self, year, layout=None):
+        layout = layout if layout is not None else self.layout()
+        return year if year and year in layout else SHARED_POOL
+
+    # -- hot path ---------------------------------------------------------
+    def claim(self, year=None):
+        """Take one seat from ``year``'s pool. Returns the shard pk or None if full."""
+        layout = self.layout()
+        shard_id = self._claim_from(layout.get(self.pool_for(year, layout), []))
+        if shard_id is not None:
+            return shard_id
+        # Every known shard was full: the pool is sold out, or it was
+        # reprovisioned by another process. One read tells which; only shards
+        # that still show a free seat are tried again.
+        layout, free = {}, set()
+        for pk, pool, capacity, booked in SeatShard.objects.order_by('year', 'shard').values_list(
+            'pk', 'year', 'capacity', 'booked'
+        ):
+            layout.setdefault(pool, []).append(pk)
+            if booked < capacity:
+                free.add(pk)
+        with self._lock:
+            self._layout = layout
+        shard_ids = [pk for pk in layout.get(self.pool_for(year, layout), []) if pk in free]
+        return self._claim_from(shard_ids)
+
+    def _claim_from(self, shard_ids):
+        if not shard_ids:
+            return None
+        start = random.randrange(len(shard_ids))
+        for shard_id in shard_ids[start:] + shard_ids[:start]:
+            claimed = SeatShard.objects.filter(
+                pk=shard_id, booked__lt=F('capacity')
+            ).update(booked=F('booked') + 1)
+            if claimed:
+                return shard_id
+        return None
+
+    def release(self, shard_id):
+        if shard_id is None:
+            return
+        SeatShard.objects.filter(pk=shard_id, booked__gt=0).update(booked=F('booked') - 1)
+
+    def remaining(self, year=None):
+        """Seats left overall, or in the pool ``year`` books from."""
+        shards = SeatShard.objects.all()
+        if year is not None:
+            shards = shards.filter(year=self.pool_for(year))
+        totals = shards.aggregate(capacity=Sum('capacity'), booked=Sum('booked'))
+        return (totals['capacity'] or 0) - (totals['booked'] or 0)
+
+    async def aremaining(self):
+        totals = await SeatShard.objects.aaggregate(capacity=Sum('capacity'), booked=Sum('booked'))
+        return (totals['capacity'] or 0) - (totals['booked'] or 0)
+
+    # -- provisioning -----------------------------------------------------
+    def provision(self, capacity, shards=None, quotas=None):
+        """(Re)build the shard layout.
+
+        ``capacity`` is the total seat count; ``quotas`` maps a year to the
+        seats reserved for it and the rest goes to the shared pool. Existing
+        bookings stay counted: bookings on removed shards move to shard 0 of
+        their pool and every shard's ``booked`` is recomputed.
+        """
+        shards = shards or getattr(settings, 'BOOKING_INVENTORY_SHARDS', 8)
+        quotas = {year: int(seats) for year, seats in (quotas or {}).items() if seats}
+        shared = capacity - sum(quotas.values())
+        if shared < 0:
+            raise ValueError("Year quotas exceed total capacity.")
+        pools = {SHARED_POOL: shared, **quotas}
+
+        with transaction.atomic():
+            keep = []
+            for year, seats in pools.items():
+                base, extra = divmod(seats, shards)
+                first = None
+                for index in range(shards):
+                    shard, _ = SeatShard.objects.update_or_create(
+                        year=year, shard=index,
+                        defaults={'capacity': base + (1 if index < extra else 0)},
+                    )
+                    first = first or shard
+                    keep.append(shard.pk)
+                Bookings.objects.filter(shard__year=year).exclude(shard_id__in=keep).update(shard=first)
+
+            # pools that no longer exist hand their bookings to the shared pool
+            shared_first = SeatShard.objects.get(year=SHARED_POOL, shard=0)
+            Bookings.objects.exclude(shard_id__in=keep).update(shard=shared_first)
+            SeatShard.objects.exclude(pk__in=keep).delete()
+
+            counts = dict(Bookings.objects.values_list('shard').annotate(n=Count('pk')))
+            for shard in SeatShard.objects.all():
+                SeatShard.objects.filter(pk=shard.pk).update(booked=counts.get(shard.pk, 0))
+            BookingStats.rebuild()
+
+        self.invalidate()
+        return pools
+
+
+inventory = SeatInventory()
@@ -0,0 +1,293 @@
+import asyncio
+import json
+import logging
+import os
+import queue
+import random
+import tempfile
+import threading
+import time
+from unittest import mock
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+from channels.layers import get_channel_layer
+from rest_framework_simplejwt.tokens import AccessToken
+from booking.broadcast import broadcaster
+from booking.inventory import inventory
+from booking.models import Bookings, BookingStats, SeatShard
+
+User = get_user_model()
+
+FIRST_MOODLE_ID = 90000000
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class Recorder:
+    """Thread-safe collection of latency samples per operation."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+        self.statuses = {}
+
+    def add(self, op, seconds, status_code=None):
+        with self._lock:
+            self.samples.setdefault(op, []).append(seconds)
+            if status_code is not None:
+                counts = self.statuses.setdefault(op, {})
+                counts[status_code] = counts.get(status_code, 0) + 1
+
+
+class FanoutProbe:
+    """Websocket stand-ins listening on the booking group.
+
+    Runs its own event loop and attaches the broadcaster to it, so flushes and
+    listeners share one loop just like consumers on the ASGI server.
+    """
+
+    def __init__(self, listeners):
+        self.listeners = listeners
+        self.published = {}
+        self.lags = []
+        self.frames = 0
+        self._lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._tasks = []
+
+    def start(self):
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+
+    async def _start(self):
+        broadcaster.attach()
+        layer = get_channel_layer()
+        for _ in range(self.listeners):
+            channel = await layer.new_channel()
+            await layer.group_add(broadcaster.group_name, channel)
+            self._tasks.append(asyncio.create_task(self._listen(layer, channel)))
+
+    async def _listen(self, layer, channel):
+        while True:
+            message = await layer.receive(channel)
+            received = time.perf_counter()
+            with self._lock:
+                self.frames += 1
+                sent = self.published.get(message.get('remaining'))
+                if sent is not None:
+                    self.lags.append(received - sent)
+
+    def record_publish(self, remaining):
+        with self._lock:
+            self.published[remaining] = time.perf_counter()
+
+    def stop(self):
+        for task in self._tasks:
+            self._loop.call_soon_threadsafe(task.cancel)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark seat booking under concurrency against a throwaway test database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=500, help='Number of simulated students (default: 500)')
+        parser.add_argument('--capacity', type=int, default=100, help='Seats available (default: 100)')
+        parser.add_argument('--concurrency', type=int, default=32, help='Concurrent clients (default: 32)')
+        parser.add_argument('--shards', type=int, default=settings.BOOKING_INVENTORY_SHARDS,
+                            help='Seat inventory shards (default: BOOKING_INVENTORY_SHARDS)')
+        parser.add_argument('--cancel-ratio', type=float, default=0.1,
+                            help='Share of successful bookings cancelled afterwards (default: 0.1)')
+        parser.add_argument('--listeners', type=int, default=20,
+                            help='Websocket listeners on the booking group (default: 20)')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for repeatable runs')
+        parser.add_argument('--output', type=str, help='Also write the report as JSON to this file')
+
+    def handle(self, *args, **options):
+        if options['seed'] is not None:
+            random.seed(options['seed'])
+
+        # never touch real data: run against a fresh test database
+        if connection.vendor == 'sqlite':
+            # a file (not :memory:) so worker threads share it, and writers
+            # queue on the lock instead of failing with "database is locked"
+            test_name = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = test_name
+            connection.settings_dict['OPTIONS'].update(timeout=30, transaction_mode='IMMEDIATE')
+        # sold-out 400s are expected; keep them out of the report
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            # the pooled client was built in BookingConfig.ready; drop it too, or a
+            # Redis engine would DECR/INCR the live gate and queue keys
+            with override_settings(
+                CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+                BOOKING_WAITING_ROOM_ENABLED=False,
+                ALLOWED_HOSTS=['*'],
+                UPSTASH_REDIS_URL=None,
+            ), mock.patch('booking.utils._client', None):
+                report = self.run_benchmark(options)
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.print_report(report)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f'Report written to {options["output"]}')
+
+    def run_benchmark(self, options):
+        inventory.provision(options['capacity'], shards=options['shards'])
+        User.objects.bulk_create([
+            User(moodleID=FIRST_MOODLE_ID + i, username=f'bench_{i}', year='FE')
+            for i in range(options['students'])
+        ])
+        tokens = [
+            str(AccessToken.for_user(user))
+            for user in User.objects.filter(moodleID__gte=FIRST_MOODLE_ID).order_by('moodleID')
+        ]
+
+        recorder = Recorder()
+        probe = FanoutProbe(options['listeners'])
+        probe.start()
+
+        original_claim = inventory.claim
+        original_publish = broadcaster.publish
+
+        def timed_claim(year=None):
+            # the whole claim (every conditional UPDATE tried), not row-lock wait alone
+            started = time.perf_counter()
+            try:
+                return original_claim(year)
+            finally:
+                recorder.add('shard_claim', time.perf_counter() - started)
+
+        def traced_publish(remaining):
+            probe.record_publish(remaining)
+            original_publish(remaining)
+
+        work = queue.Queue()
+        for token in tokens:
+            work.put(token)
+
+        def worker():
+            client = Client()
+            try:
+                while True:
+                    try:
+                        token = work.get_nowait()
+                    except queue.Empty:
+                        return
+                    try:
+                        self.simulate_student(client, token, recorder, options['cancel_ratio'])
+                    except Exception as exc:
+                        recorder.add('errors', 0.0, type(exc).__name__)
+            finally:
+                connections.close_all()
+
+        with mock.patch.object(inventory, 'claim', timed_claim), \
+                mock.patch.object(broadcaster, 'publish', traced_publish):
+            started = time.perf_counter()
+            threads = [threading.Thread(target=worker) for _ in range(options['concurrency'])]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+            # let the last coalesced tick reach the listeners
+            time.sleep(broadcaster.interval * 3)
+        probe.stop()
+
+        return self.build_report(options, recorder, probe, elapsed)
+
+    def simulate_student(self, client, token, recorder, cancel_ratio):
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+        started = time.perf_counter()
+        resp = client.post(reverse('book-seat'), {'year': 'FE'}, content_type='application/json', **auth)
+        recorder.add('book_seat', time.perf_counter() - started, resp.status_code)
+
+        started = time.perf_counter()
+        remaining = client.get(reverse('remaining-seats'), **auth)
+        recorder.add('get_remaining', time.perf_counter() - started, remaining.status_code)
+
+        if resp.status_code == 201 and random.random() < cancel_ratio:
+            started = time.perf_counter()
+            cancel = client.post(reverse('cancel-booking'), **auth)
+            recorder.add('cancel_booking', time.perf_counter() - started, cancel.status_code)
+
+    def build_report(self, options, recorder, probe, elapsed):
+        operations = {}
+        for op, samples in recorder.samples.items():
+            operations[op] = {
+                'count': len(samples),
+                'throughput_per_s': round(len(samples) / elapsed, 1) if elapsed else 0,
+                'p50_ms': round(percentile(samples, 50) * 1000, 2),
+                'p99_ms': round(percentile(samples, 99) * 1000, 2),
+                'max_ms': round(max(samples) * 1000, 2),
+                'statuses': {str(k): v for k, v in sorted(recorder.statuses.get(op, {}).items())},
+            }
+
+        bookings = Bookings.objects.count()
+        shard_booked = sum(SeatShard.objects.values_list('booked', flat=True))
+        stats = BookingStats.objects.get(pk=BookingStats.TOTAL)
+        return {
+            'config': {k: options[k] for k in ('students', 'capacity', 'concurrency', 'shards', 'cancel_ratio', 'listeners')},
+            'database': connection.vendor,
+            'elapsed_s': round(elapsed, 3),
+            'operations': operations,
+            'integrity': {
+                'bookings': bookings,
+                'oversold': max(0, bookings - options['capacity']),
+                'shard_counter_drift': shard_booked - bookings,
+                'stats_drift': stats.booked - bookings,
+            },
+            'fanout': {
+                'listeners': options['listeners'],
+                'frames_received': probe.frames,
+                'lag_p50_ms': round(percentile(probe.lags, 50) * 1000, 2),
+                'lag_p99_ms': round(percentile(probe.lags, 99) * 1000, 2),
+            },
+        }
+
+    def print_report(self, report):
+        config = report['config']
+        self.stdout.write(
+            f"{config['students']} students, {config['capacity']} seats, {config['concurrency']} clients, "
+            f"{config['shards']} shards on {report['database']} ({report['elapsed_s']}s)"
+        )
+        self.stdout.write(f"{'operation':<16}{'count':>8}{'ops/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}  statuses")
+        for op, row in sorted(report['operations'].items()):
+            self.stdout.write(
+                f"{op:<16}{row['count']:>8}{row['throughput_per_s']:>10}{row['p50_ms']:>10}"
+                f"{row['p99_ms']:>10}{row['max_ms']:>10}  {row['statuses']}"
+            )
+        if 'shard_claim' in report['operations']:
+            self.stdout.write('shard_claim is the full inventory.claim call, including any row-lock wait')
+        fanout = report['fanout']
+        self.stdout.write(
+            f"fan-out: {fanout['frames_received']} frames to {fanout['listeners']} listeners, "
+            f"lag p50 {fanout['lag_p50_ms']} ms, p99 {fanout['lag_p99_ms']} ms"
+        )
+        integrity = report['integrity']
+        line = (
+            f"bookings {integrity['bookings']}, oversold {integrity['oversold']}, "
+            f"shard drift {integrity['shard_counter_drift']}, stats drift {integrity['stats_drift']}"
+        )
+        if integrity['oversold'] or integrity['shard_counter_drift'] or integrity['stats_drift']:
+            self.stdout.write(self.style.ERROR(line))
+        else:
+            self.stdout.write(self.style.SUCCESS(line))
@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from booking.inventory import inventory
+from booking.reservation import get_reservation_engine
+from booking.utils import set_remaining_cache
+from booking.waiting_room import waiting_room
+
+
+class Command(BaseCommand):
+    help = 'Build or resize the sharded seat inventory used for bookings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--capacity',
+            type=int,
+            default=settings.BOOKING_TOTAL_CAPACITY,
+            help='Total number of seats (default: BOOKING_TOTAL_CAPACITY)'
+        )
+        parser.add_argument(
+            '--shards',
+            type=int,
+            default=settings.BOOKING_INVENTORY_SHARDS,
+            help='Shards per pool (default: BOOKING_INVENTORY_SHARDS)'
+        )
+        parser.add_argument(
+            '--quota',
+            action='append',
+            default=[],
+            metavar='YEAR=SEATS',
+            help='Seats reserved for a year, e.g. --quota FE=100. May be repeated.'
+        )
+        parser.add_argument(
+            '--reset-queue',
+            action='store_true',
+            help='Clear the booking waiting room so the next opening starts from ticket 1'
+        )
+
+    def handle(self, *args, **options):
+        quotas = dict(settings.BOOKING_YEAR_QUOTAS)
+        for item in options['quota']:
+            year, _, seats = item.partition('=')
+            if not seats.isdigit():
+                raise CommandError(f'Invalid quota "{item}", expected YEAR=SEATS')
+            quotas[year.upper()] = int(seats)
+
+        try:
+            pools = inventory.provision(options['capacity'], shards=options['shards'], quotas=quotas)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        set_remaining_cache(inventory.remaining())
+        # the Redis gate has no TTL; bring it to the new capacity
+        reconcile = getattr(get_reservation_engine(), 'reconcile', None)
+        if reconcile is not None:
+            reconcile()
+        if options['reset_queue']:
+            waiting_room.reset()
+            self.stdout.write('Waiting room cleared')
+        for year, seats in pools.items():
+            self.stdout.write(f'{year or "shared"}: {seats} seats over {options["shards"]} shards')
+        self.stdout.write(self.style.SUCCESS(
+            f'Seat inventory ready, {inventory.remaining()} seats remaining'
+        ))
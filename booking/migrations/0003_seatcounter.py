@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-17 10:12
+
+from django.db import migrations, models
+
+
+# Matches booking.utils.TOTAL_CAPACITY at the time this migration was written.
+INITIAL_CAPACITY = 5
+
+
+def seed_counter(apps, schema_editor):
+    Bookings = apps.get_model('booking', 'Bookings')
+    SeatCounter = apps.get_model('booking', 'SeatCounter')
+    SeatCounter.objects.update_or_create(
+        pk=1,
+        defaults={'capacity': INITIAL_CAPACITY, 'booked': Bookings.objects.count()},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0002_bookings_attended'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('capacity', models.PositiveIntegerField(default=0)),
+                ('booked', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_counter, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def link_existing_bookings(apps, schema_editor):
+    # the old single counter row becomes shard 0 of the shared pool
+    Bookings = apps.get_model('booking', 'Bookings')
+    SeatShard = apps.get_model('booking', 'SeatShard')
+    shard = SeatShard.objects.order_by('pk').first()
+    if shard is None:
+        return
+    Bookings.objects.filter(shard__isnull=True).update(shard=shard)
+    SeatShard.objects.filter(pk=shard.pk).update(booked=Bookings.objects.filter(shard=shard).count())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0003_seatcounter'),
+    ]
+
+    operations = [
+        migrations.RenameModel(
+            old_name='SeatCounter',
+            new_name='SeatShard',
+        ),
+        migrations.AddField(
+            model_name='seatshard',
+            name='year',
+            field=models.CharField(blank=True, choices=[('FE', 'First Year (FE)'), ('SE', 'Second Year (SE)'), ('TE', 'Third Year (TE)'), ('BE', 'Fourth Year (BE)')], default='', max_length=2),
+        ),
+        migrations.AddField(
+            model_name='seatshard',
+            name='shard',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddConstraint(
+            model_name='seatshard',
+            constraint=models.UniqueConstraint(fields=('year', 'shard'), name='unique_seat_shard_per_pool'),
+        ),
+        migrations.AddField(
+            model_name='bookings',
+            name='shard',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bookings', to='booking.seatshard'),
+        ),
+        migrations.RunPython(link_existing_bookings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-17 14:05
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+YEARS = ['FE', 'SE', 'TE', 'BE']
+
+
+def build_stats(apps, schema_editor):
+    Bookings = apps.get_model('booking', 'Bookings')
+    SeatShard = apps.get_model('booking', 'SeatShard')
+    BookingStats = apps.get_model('booking', 'BookingStats')
+
+    capacity = dict(SeatShard.objects.values_list('year').annotate(seats=Sum('capacity')))
+    counts = {
+        row['year']: row for row in Bookings.objects.values('year').annotate(
+            booked=Count('pk'), attended=Count('pk', filter=Q(attended=True))
+        )
+    }
+    BookingStats.objects.create(
+        key='ALL',
+        capacity=sum(capacity.values()),
+        booked=sum(row['booked'] for row in counts.values()),
+        attended=sum(row['attended'] for row in counts.values()),
+    )
+    for year in YEARS:
+        row = counts.get(year, {})
+        BookingStats.objects.create(
+            key=year,
+            capacity=capacity.get(year, 0),
+            booked=row.get('booked', 0),
+            attended=row.get('attended', 0),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0004_seat_inventory_shards'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingStats',
+            fields=[
+                ('key', models.CharField(max_length=3, primary_key=True, serialize=False)),
+                ('capacity', models.PositiveIntegerField(default=0)),
+                ('booked', models.PositiveIntegerField(default=0)),
+                ('attended', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Booking stats',
+            },
+        ),
+        migrations.RunPython(build_stats, migrations.RunPython.noop),
+    ]
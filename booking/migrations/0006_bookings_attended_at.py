@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 12:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0005_bookingstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookings',
+            name='attended_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,4 +1,7 @@
 from django.db import models
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
 from django.conf import settings
 
 
@@ -15,6 +18,8 @@ class Bookings(models.Model):
     year = models.CharField(max_length=2, choices=YEAR_CHOICES)
     registered_on = models.DateTimeField(auto_now_add=True)
     attended = models.BooleanField(default=False)
+    attended_at = models.DateTimeField(null=True, blank=True)
+    shard = models.ForeignKey('SeatShard', on_delete=models.SET_NULL, null=True, blank=True, related_name='bookings')
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=['student'], name='unique_booking_per_student')
@@ -22,3 +27,145 @@ class Bookings(models.Model):
 
     def __str__(self):
         return f"Booking(student={self.student}, year={self.year})"
+
+
+class SeatShard(models.Model):
+    """One slice of the seat inventory.
+
+    Capacity is split across several shards per pool so concurrent bookings
+    claim seats with conditional UPDATEs on different rows. A pool is either
+    a year quota (``year`` set) or the shared pool (``year`` blank).
+    """
+    year = models.CharField(max_length=2, choices=YEAR_CHOICES, blank=True, default='')
+    shard = models.PositiveSmallIntegerField(default=0)
+    capacity = models.PositiveIntegerField(default=0)
+    booked = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['year', 'shard'], name='unique_seat_shard_per_pool')
+        ]
+
+    @property
+    def remaining(self):
+        return self.capacity - self.booked
+
+    def __str__(self):
+        return f"SeatShard(pool={self.year or 'shared'}, shard={self.shard}, booked={self.booked}/{self.capacity})"
+
+
+class BookingStats(models.Model):
+    """Booking counters kept in step with the Bookings table.
+
+    One row holds the totals (``key='ALL'``) and one row per year holds that
+    year's numbers; ``capacity`` mirrors the seat inventory (the year rows
+    carry the year's quota, 0 if it books from the shared pool). Rows are
+    updated in the same transaction as the booking change, so reading the
+    remaining seats is a primary-key lookup.
+    """
+    TOTAL = 'ALL'
+
+    key = models.CharField(max_length=3, primary_key=True)
+    capacity = models.PositiveIntegerField(default=0)
+    booked = models.PositiveIntegerField(default=0)
+    attended = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'Booking stats'
+
+    @property
+    def remaining(self):
+        return self.capacity - self.booked
+
+    @classmethod
+    def remaining_seats(cls):
+        return cls.objects.get(pk=cls.TOTAL).remaining
+
+    @classmethod
+    async def aremaining_seats(cls):
+        return (await cls.objects.aget(pk=cls.TOTAL)).remaining
+
+    @classmethod
+    def record(cls, year, booked=0, attended=0):
+        """Apply booking/attendance deltas to the total row and ``year``'s row."""
+        cls.objects.filter(pk__in=[cls.TOTAL, year]).update(
+            booked=F('booked') + booked,
+            attended=F('attended') + attended,
+        )
+
+    @classmethod
+    def record_attendance(cls, by_year):
+        """Add ``{year: checked_in}`` to attendance in one UPDATE."""
+        total = sum(by_year.values())
+        if not total:
+            return
+        cls.objects.filter(pk__in=[cls.TOTAL, *by_year]).update(
+            attended=F('attended') + Case(
+                When(pk=cls.TOTAL, then=Value(total)),
+                *[When(pk=year, then=Value(count)) for year, count in by_year.items()],
+                default=Value(0),
+            )
+        )
+
+    @classmethod
+    def rebuild(cls):
+        """Recompute every row from SeatShard and Bookings."""
+        capacity = dict(SeatShard.objects.values_list('year').annotate(seats=Sum('capacity')))
+        counts = {
+            row['year']: row for row in Bookings.objects.values('year').annotate(
+                booked=Count('pk'), attended=Count('pk', filter=Q(attended=True))
+            )
+        }
+        rows = {cls.TOTAL: {
+            'capacity': sum(capacity.values()),
+            'booked': sum(row['booked'] for row in counts.values()),
+            'attended': sum(row['attended'] for row in counts.values()),
+        }}
+        for year, _ in YEAR_CHOICES:
+            row = counts.get(year, {})
+            rows[year] = {
+                'capacity': capacity.get(year, 0),
+                'booked': row.get('booked', 0),
+                'attended': row.get('attended', 0),
+            }
+        for key, values in rows.items():
+            cls.objects.update_or_create(key=key, defaults=values)
+
+    def __str__(self):
+        return f"BookingStats({self.key}: booked={self.booked}/{self.capacity}, attended={self.attended})"
+
+
+@receiver(pre_save, sender=Bookings)
+def remember_counted_booking(sender, instance, raw=False, update_fields=None, **kwargs):
+    # what the stats currently count for this booking, so an edit (e.g. ticking
+    # attended in the admin) can be moved across in post_save
+    instance._counted = None
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not {'year', 'attended'} & set(update_fields):
+        return
+    instance._counted = Bookings.objects.filter(pk=instance.pk).values_list('year', 'attended').first()
+
+
+@receiver(post_save, sender=Bookings)
+def count_new_booking(sender, instance, created, **kwargs):
+    if created:
+        BookingStats.record(instance.year, booked=1, attended=int(instance.attended))
+        return
+    counted = getattr(instance, '_counted', None)
+    if counted is None or counted == (instance.year, instance.attended):
+        return
+    year, attended = counted
+    if year == instance.year:
+        BookingStats.record(year, attended=int(instance.attended) - int(attended))
+    else:
+        BookingStats.record(year, booked=-1, attended=-int(attended))
+        BookingStats.record(instance.year, booked=1, attended=int(instance.attended))
+
+
+@receiver(post_delete, sender=Bookings)
+def count_removed_booking(sender, instance, **kwargs):
+    from .reservation import get_reservation_engine
+    BookingStats.record(instance.year, booked=-1, attended=-int(instance.attended))
+    # keep the seat counters in step with deletes made outside the engine too
+    get_reservation_engine().booking_removed(instance)
@@ -0,0 +1,151 @@
+"""Seat reservation engines.
+
+An engine owns the capacity check and the insert/delete of a booking. The
+default engine claims a seat from the sharded ``SeatInventory`` with a
+single conditional UPDATE, so no global lock is needed. The Redis
+engine puts an atomic ``DECR`` in front of it to turn away requests once
+seats run out without touching the database.
+
+The active engine is chosen with ``settings.BOOKING_RESERVATION_ENGINE``.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction, IntegrityError
+from django.utils.module_loading import import_string
+from rest_framework import status
+from .inventory import inventory
+from .models import Bookings, BookingStats
+from .utils import _get_redis_client
+
+DEFAULT_ENGINE = 'booking.reservation.DatabaseReservationEngine'
+
+
+class ReservationError(Exception):
+    status_code = status.HTTP_400_BAD_REQUEST
+    detail = 'Booking conflict.'
+
+    def __init__(self, detail=None):
+        if detail is not None:
+            self.detail = detail
+        super().__init__(self.detail)
+
+
+class AlreadyBooked(ReservationError):
+    detail = 'Student already booked.'
+
+
+class CapacityFull(ReservationError):
+    detail = 'Capacity full.'
+
+
+class NoBooking(ReservationError):
+    status_code = status.HTTP_404_NOT_FOUND
+    detail = 'No booking found.'
+
+
+class DatabaseReservationEngine:
+    """Claim seats with ``UPDATE ... SET booked = booked + 1 WHERE booked < capacity`` on one shard."""
+
+    def reserve(self, student, year):
+        """Book a seat for ``student`` and return the remaining seat count."""
+        with transaction.atomic():
+            shard_id = inventory.claim(year)
+            if shard_id is None:
+                raise CapacityFull()
+            try:
+                # the unique constraint on student replaces the exists() pre-check;
+                # raising here rolls back the shard increment as well
+                Bookings.objects.create(student=student, year=year, shard_id=shard_id)
+            except IntegrityError:
+                raise AlreadyBooked()
+            return BookingStats.remaining_seats()
+
+    def release(self, student):
+        """Cancel ``student``'s booking and return the remaining seat count."""
+        with transaction.atomic():
+            booking = Bookings.objects.filter(student=student).only('pk', 'shard_id', 'year', 'attended').first()
+            if booking is None:
+                raise NoBooking()
+            # the post_delete receiver gives the seat back (booking_removed)
+            booking.delete()
+            return BookingStats.remaining_seats()
+
+    def booking_removed(self, booking):
+        """Return ``booking``'s seat; runs for every delete (API, admin, cascades)."""
+        inventory.release(booking.shard_id)
+
+    def remaining(self):
+        return BookingStats.remaining_seats()
+
+    # The ORM's async API has no transactions, so the async views run the
+    # transactional part in a worker thread.
+    async def areserve(self, student, year):
+        return await sync_to_async(self.reserve)(student, year)
+
+    async def arelease(self, student):
+        return await sync_to_async(self.release)(student)
+
+
+class RedisReservationEngine(DatabaseReservationEngine):
+    """Gate reservations with a Redis ``DECR`` before hitting the database.
+
+    The Redis key only filters traffic; the shard counters stay the source
+    of truth. The key is seeded from the database when missing and every
+    failed or cancelled reservation gives its seat back.
+    """
+    key = 'booking:seats_left'
+
+    def reserve(self, student, year):
+        client = _get_redis_client()
+        if client is None:
+            return super().reserve(student, year)
+        try:
+            if not client.exists(self.key):
+                self.reconcile(client, overwrite=False)
+            left = client.decr(self.key)
+        except Exception:
+            # Redis unavailable: the shard counters alone still enforce capacity
+            return super().reserve(student, year)
+
+        if left < 0:
+            self._give_back(client)
+            raise CapacityFull()
+        try:
+            return super().reserve(student, year)
+        except ReservationError:
+            self._give_back(client)
+            raise
+
+    def booking_removed(self, booking):
+        super().booking_removed(booking)
+
+        def give_back():
+            client = _get_redis_client()
+            if client is not None:
+                self._give_back(client)
+        transaction.on_commit(give_back)
+
+    def reconcile(self, client=None, overwrite=True):
+        """Reset the Redis gate from the shard counters."""
+        client = client or _get_redis_client()
+        if client is None:
+            return False
+        client.set(self.key, max(self.remaining(), 0), nx=not overwrite)
+        return True
+
+    def _give_back(self, client):
+        try:
+            client.incr(self.key)
+        except Exception:
+            pass
+
+
+_engine = None
+
+
+def get_reservation_engine():
+    global _engine
+    if _engine is None:
+        path = getattr(settings, 'BOOKING_RESERVATION_ENGINE', DEFAULT_ENGINE)
+        _engine = import_string(path)()
+    return _engine
@@ -0,0 +1,355 @@
+import time
+from io import StringIO
+from unittest import mock
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.tokens import RefreshToken
+from .broadcast import RemainingBroadcaster
+from .inventory import inventory
+from .models import Bookings, BookingStats, SeatShard
+from .utils import REMAINING_KEY, CircuitBreaker, aget_remaining_seats, aset_remaining_cache
+from .waiting_room import waiting_room
+
+User = get_user_model()
+
+
+class BookSeatTests(TestCase):
+    def setUp(self):
+        inventory.provision(2, shards=2)
+        self.students = [
+            User.objects.create_user(moodleID=3001 + i, password='pass1234') for i in range(3)
+        ]
+
+    def book(self, student, **extra):
+        self.client.force_login(student)
+        return self.client.post(reverse('book-seat'), {}, content_type='application/json', **extra)
+
+    def test_book_seat_claims_counter(self):
+        resp = self.book(self.students[0])
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.json()['remaining'], 1)
+        self.assertEqual(inventory.remaining(), 1)
+
+    def test_duplicate_booking_does_not_consume_seat(self):
+        self.book(self.students[0])
+        resp = self.book(self.students[0])
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.json()['detail'], 'Student already booked.')
+        self.assertEqual(inventory.remaining(), 1)
+
+    def test_capacity_is_never_exceeded(self):
+        codes = [self.book(s).status_code for s in self.students]
+        self.assertEqual(codes, [201, 201, 400])
+        self.assertEqual(Bookings.objects.count(), 2)
+        self.assertEqual(inventory.remaining(), 0)
+
+    def test_cancel_releases_seat(self):
+        self.book(self.students[0])
+        resp = self.client.post(reverse('cancel-booking'))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()['remaining'], 2)
+        resp = self.client.post(reverse('cancel-booking'))
+        self.assertEqual(resp.status_code, 404)
+
+    def test_stats_follow_bookings_and_attendance(self):
+        self.book(self.students[0])
+        self.book(self.students[1])
+        admin = User.objects.create_user(moodleID=3999, password='pass1234', is_staff=True)
+        self.client.force_login(admin)
+        self.client.post(reverse('mark-present', args=[self.students[0].moodleID]))
+        self.client.post(reverse('mark-present', args=[self.students[0].moodleID]))
+
+        total = BookingStats.objects.get(pk=BookingStats.TOTAL)
+        self.assertEqual((total.capacity, total.booked, total.attended), (2, 2, 1))
+        self.assertEqual(BookingStats.objects.get(pk='FE').booked, 2)
+
+        Bookings.objects.filter(student=self.students[0]).delete()
+        total.refresh_from_db()
+        self.assertEqual((total.booked, total.attended), (1, 0))
+
+    def test_stats_follow_attendance_edits_outside_check_in(self):
+        self.book(self.students[0])
+        booking = Bookings.objects.get()
+        # e.g. ticking "attended" in the admin
+        booking.attended = True
+        booking.save()
+        booking.save()
+        self.assertEqual(BookingStats.objects.get(pk='FE').attended, 1)
+        booking.attended = False
+        booking.save()
+        total = BookingStats.objects.get(pk=BookingStats.TOTAL)
+        self.assertEqual((total.booked, total.attended), (1, 0))
+
+    def test_idempotent_retry_replays_first_response(self):
+        first = self.book(self.students[0], HTTP_IDEMPOTENCY_KEY='abc')
+        retry = self.book(self.students[0], HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(inventory.remaining(), 1)
+
+    def test_async_views_accept_jwt_and_reject_anonymous(self):
+        self.assertEqual(self.client.get(reverse('remaining-seats')).status_code, 401)
+        token = RefreshToken.for_user(self.students[0]).access_token
+        resp = self.client.get(reverse('remaining-seats'), HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()['remaining'], 2)
+
+
+class SeatInventoryTests(TestCase):
+    def setUp(self):
+        inventory.provision(4, shards=2, quotas={'FE': 1})
+        self.students = [
+            User.objects.create_user(moodleID=3101 + i, password='pass1234', year='SE') for i in range(3)
+        ]
+
+    def test_year_quota_is_separate_pool(self):
+        User.objects.filter(pk__in=[self.students[0].pk, self.students[1].pk]).update(year='FE')
+        self.client.force_login(self.students[0])
+        self.assertEqual(self.client.post(reverse('book-seat'), {}).status_code, 201)
+        self.client.force_login(self.students[1])
+        self.assertEqual(self.client.post(reverse('book-seat'), {}).status_code, 400)
+        self.assertEqual(inventory.remaining('FE'), 0)
+        self.assertEqual(inventory.remaining('SE'), 3)
+
+    def test_pool_follows_the_students_year_not_the_payload(self):
+        self.client.force_login(self.students[0])
+        self.assertEqual(self.client.post(reverse('book-seat'), {'year': 'FE'}).status_code, 201)
+        self.assertEqual(Bookings.objects.get().year, 'SE')
+        self.assertEqual((inventory.remaining('FE'), inventory.remaining('SE')), (1, 2))
+
+    def test_sold_out_claim_rereads_the_layout_once(self):
+        inventory.provision(1, shards=4)
+        self.assertIsNotNone(inventory.claim('SE'))
+        inventory.layout()
+        # four full shards tried, one read, nothing retried
+        with self.assertNumQueries(5):
+            self.assertIsNone(inventory.claim('SE'))
+
+    def test_claim_follows_a_layout_changed_elsewhere(self):
+        inventory.layout()
+        SeatShard.objects.all().delete()
+        SeatShard.objects.create(year='', shard=0, capacity=1)
+        # the cached layout still names the deleted shards
+        self.assertEqual(inventory.claim('SE'), SeatShard.objects.get().pk)
+
+    def test_provision_keeps_existing_bookings_counted(self):
+        self.client.force_login(self.students[0])
+        self.client.post(reverse('book-seat'), {})
+        inventory.provision(4, shards=1)
+        self.assertEqual(SeatShard.objects.count(), 1)
+        self.assertEqual(inventory.remaining(), 3)
+
+    def test_deletes_outside_the_engine_free_the_seat(self):
+        inventory.provision(1, shards=1)
+        self.client.force_login(self.students[0])
+        self.client.post(reverse('book-seat'), {})
+        # e.g. the admin, or a cascade from deleting the student
+        self.students[0].delete()
+        self.assertEqual((inventory.remaining(), BookingStats.remaining_seats()), (1, 1))
+
+        self.client.force_login(self.students[1])
+        self.assertEqual(self.client.post(reverse('book-seat'), {}).status_code, 201)
+
+    def test_admin_add_claims_a_seat(self):
+        inventory.provision(1, shards=1)
+        admin = User.objects.create_superuser(moodleID=3999, password='pass1234')
+        self.client.force_login(admin)
+        url = reverse('admin:booking_bookings_add')
+        resp = self.client.post(url, {'student': self.students[0].pk, 'year': 'SE'})
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(inventory.remaining(), 0)
+
+        resp = self.client.post(url, {'student': self.students[1].pk, 'year': 'SE'})
+        self.assertContains(resp, 'No seats left for this year.')
+        self.assertEqual((Bookings.objects.count(), BookingStats.remaining_seats()), (1, 0))
+
+    def test_provision_reconciles_reservation_gate(self):
+        engine = mock.Mock()
+        with mock.patch('booking.management.commands.provision_seats.get_reservation_engine', return_value=engine):
+            call_command('provision_seats', capacity=2, shards=1, stdout=StringIO())
+        engine.reconcile.assert_called_once_with()
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def test_opens_after_threshold_and_allows_one_trial(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+        with mock.patch('booking.utils.time.monotonic', return_value=breaker._opened_at + 31):
+            self.assertTrue(breaker.allow())
+            self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertTrue(breaker.allow())
+
+    def test_abandoned_trial_expires(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        breaker.record_failure()
+        opened = breaker._opened_at
+        with mock.patch('booking.utils.time.monotonic', return_value=opened + 31):
+            # the trial caller never sends a command
+            self.assertTrue(breaker.allow())
+        with mock.patch('booking.utils.time.monotonic', return_value=opened + 45):
+            self.assertFalse(breaker.allow())
+        with mock.patch('booking.utils.time.monotonic', return_value=opened + 62):
+            self.assertTrue(breaker.allow())
+
+
+class RemainingCacheTests(SimpleTestCase):
+    def test_write_through_replaces_a_stale_fill(self):
+        store = {}
+
+        class Client:
+            async def get(self, key):
+                return store.get(key, (None,))[0]
+
+            async def set(self, key, value, ex=None, nx=False):
+                if not (nx and key in store):
+                    store[key] = (value, ex)
+
+        with mock.patch('booking.utils._aget_redis_client', return_value=Client()), \
+                mock.patch.object(BookingStats, 'aremaining_seats', mock.AsyncMock(return_value=5)):
+            # a reader filled the cache just before a booking committed
+            self.assertEqual(async_to_sync(aget_remaining_seats)(), 5)
+            self.assertEqual(store[REMAINING_KEY], ('5', 5))
+            async_to_sync(aset_remaining_cache)(4)
+            self.assertEqual(async_to_sync(aget_remaining_seats)(), 4)
+
+    def test_async_calls_share_the_pooled_client_across_loops(self):
+        client = mock.Mock()
+        client.get.return_value = '7'
+        with mock.patch('booking.utils._client', client), \
+                mock.patch('booking.utils.breaker', CircuitBreaker()):
+            # each async_to_sync call runs on a new event loop, as under WSGI
+            self.assertEqual(async_to_sync(aget_remaining_seats)(), 7)
+            self.assertEqual(async_to_sync(aget_remaining_seats)(), 7)
+        self.assertEqual(client.get.call_count, 2)
+
+
+class RemainingBroadcasterTests(SimpleTestCase):
+    def test_burst_is_coalesced_to_latest_value(self):
+        sent = []
+
+        class Layer:
+            async def group_send(self, group, message):
+                sent.append(message['remaining'])
+
+        broadcaster = RemainingBroadcaster(interval=0.1)
+        with mock.patch('booking.broadcast.get_channel_layer', return_value=Layer()):
+            for remaining in range(100, 0, -1):
+                broadcaster.publish(remaining)
+            time.sleep(0.3)
+        self.assertLessEqual(len(sent), 2)
+        self.assertEqual(sent[-1], 1)
+
+    def test_apublish_from_short_lived_loops_delivers_latest(self):
+        sent = []
+
+        class Layer:
+            async def group_send(self, group, message):
+                sent.append(message['remaining'])
+
+        broadcaster = RemainingBroadcaster(interval=0.1)
+        with mock.patch('booking.broadcast.get_channel_layer', return_value=Layer()):
+            # each call runs on its own loop, as async views do under WSGI
+            for remaining in range(10, 0, -1):
+                async_to_sync(broadcaster.apublish)(remaining)
+            time.sleep(0.3)
+        self.assertEqual(sent[-1], 1)
+
+
+@override_settings(BOOKING_WAITING_ROOM_ENABLED=True, BOOKING_ADMISSION_BURST=1, BOOKING_ADMISSION_RATE=0)
+class WaitingRoomTests(TestCase):
+    def setUp(self):
+        waiting_room.reset()
+        inventory.provision(5, shards=1)
+        self.first = User.objects.create_user(moodleID=3201, password='pass1234')
+        self.second = User.objects.create_user(moodleID=3202, password='pass1234')
+
+    def join(self, student):
+        self.client.force_login(student)
+        return self.client.post(reverse('queue-join')).json()
+
+    def test_tickets_are_admitted_in_order(self):
+        first = self.join(self.first)
+        self.assertEqual((first['ticket'], first['admitted']), (1, True))
+        self.assertEqual(self.join(self.first)['ticket'], 1)
+
+        second = self.join(self.second)
+        self.assertEqual((second['ticket'], second['position']), (2, 1))
+        resp = self.client.post(reverse('book-seat'), {}, HTTP_X_QUEUE_TOKEN=second['token'])
+        self.assertEqual(resp.status_code, 429)
+
+        self.client.force_login(self.first)
+        resp = self.client.post(reverse('book-seat'), {}, HTTP_X_QUEUE_TOKEN=first['token'])
+        self.assertEqual(resp.status_code, 201)
+
+    @override_settings(BOOKING_ADMISSION_RATE=1)
+    def test_reset_by_another_process_restarts_admission(self):
+        old = self.join(self.first)
+        # this worker has cached the clock of an opening an hour ago
+        waiting_room.local._opened_at -= 3600
+        waiting_room._read_clock()
+        # provision_seats --reset-queue runs elsewhere and clears only the shared queue
+        waiting_room.local.reset()
+
+        third = User.objects.create_user(moodleID=3203, password='pass1234')
+        self.assertEqual(self.join(self.second)['ticket'], 1)
+        new = self.join(third)
+        self.assertEqual((new['ticket'], new['position']), (2, 1))
+
+        self.client.force_login(self.first)
+        resp = self.client.get(reverse('queue-status'), {'token': old['token']})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_token_is_bound_to_student(self):
+        token = self.join(self.first)['token']
+        self.client.force_login(self.second)
+        resp = self.client.post(reverse('book-seat'), {'queue_token': token})
+        self.assertEqual(resp.status_code, 400)
+
+
+class BulkCheckInTests(TestCase):
+    def setUp(self):
+        inventory.provision(10, shards=2)
+        self.admin = User.objects.create_user(moodleID=3999, password='pass1234', is_staff=True)
+        self.booked = []
+        for i in range(3):
+            student = User.objects.create_user(moodleID=3301 + i, password='pass1234')
+            Bookings.objects.create(student=student, year='SE')
+            self.booked.append(student.moodleID)
+        Bookings.objects.filter(student_id=self.booked[2]).update(attended=True)
+
+    def test_batch_reports_each_scan(self):
+        self.client.force_login(self.admin)
+        scans = [
+            {'moodleID': self.booked[0], 'scanned_at': '2026-02-10T09:30:00+05:30'},
+            self.booked[1],
+            self.booked[2],
+            {'moodleID': self.booked[0]},
+            {'moodleID': 9999},
+            {'moodleID': 'abc'},
+            {'moodleID': self.booked[1], 'scanned_at': '2026-13-40T10:00'},
+        ]
+        resp = self.client.post(reverse('bulk-mark-present'), {'scans': scans}, content_type='application/json')
+        self.assertEqual(resp.status_code, 200)
+        statuses = [r['status'] for r in resp.json()['results']]
+        self.assertEqual(statuses, [
+            'checked_in', 'checked_in', 'already_checked_in', 'already_checked_in', 'not_booked', 'invalid',
+            'invalid',
+        ])
+        self.assertEqual(Bookings.objects.filter(attended=True).count(), 3)
+        first = Bookings.objects.get(student_id=self.booked[0])
+        self.assertEqual(first.attended_at.isoformat(), '2026-02-10T04:00:00+00:00')
+        self.assertEqual(BookingStats.objects.get(pk='SE').attended, 2)
+
+    def test_requires_staff(self):
+        self.client.force_login(User.objects.get(pk=self.booked[0]))
+        resp = self.client.post(reverse('bulk-mark-present'), {'scans': [1]}, content_type='application/json')
+        self.assertEqual(resp.status_code, 403)
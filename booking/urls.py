@@ -5,7 +5,11 @@ urlpatterns = [
     path('book/', views.book_seat, name='book-seat'),
     path('cancel/', views.cancel_booking, name='cancel-booking'),
     path('remaining/', views.get_remaining, name='remaining-seats'),
+    path('queue/join/', views.queue_join, name='queue-join'),
+    path('queue/status/', views.queue_status, name='queue-status'),
     path('my-booking/', views.my_booking, name='my-booking'),
     path('booking/<int:moodleID>/', views.get_booking_by_moodle, name='booking-by-moodle'),
     path('mark-present/<int:moodleID>/', views.mark_present, name='mark-present'),
+    path('check-in/bulk/', views.bulk_mark_present, name='bulk-mark-present'),
+    path('stats/', views.booking_stats, name='booking-stats'),
 ]
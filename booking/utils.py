@@ -1,59 +1,234 @@
-import os
+import threading
+import time
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.db import DatabaseError
-from .models import Bookings
+from .models import BookingStats
 
-TOTAL_CAPACITY = 5
+REMAINING_KEY = 'remaining_seats'
 
 
-def _get_redis_client():
-    url = os.environ.get('UPSTASH_REDIS_URL')
+class CircuitBreaker:
+    """Stop calling Redis for ``reset_timeout`` seconds after repeated failures.
+
+    While open, callers get no client and go straight to the DB instead of
+    waiting on connect timeouts. After the timeout a single trial call is
+    let through; success closes the breaker again. A trial that never reports
+    back (the caller sent no command) expires after another ``reset_timeout``.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_started = None
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self._opened_at < self.reset_timeout:
+                return False
+            if self._trial_started is not None and now - self._trial_started < self.reset_timeout:
+                return False
+            self._trial_started = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_started = None
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class _GuardedRedis:
+    """Proxy that reports every Redis command's outcome to the breaker."""
+
+    def __init__(self, client, breaker):
+        self._client = client
+        self._breaker = breaker
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            try:
+                result = attr(*args, **kwargs)
+            except Exception:
+                self._breaker.record_failure()
+                raise
+            self._breaker.record_success()
+            return result
+        return call
+
+
+class _AsyncGuardedRedis(_GuardedRedis):
+    """``_GuardedRedis`` with awaitable commands.
+
+    Commands run on the process-wide pooled sync client in a worker thread:
+    a ``redis.asyncio`` pool is tied to one event loop, and under WSGI every
+    async view gets a fresh loop, so it would reconnect on each request.
+    """
+
+    def __getattr__(self, name):
+        attr = super().__getattr__(name)
+        if not callable(attr):
+            return attr
+        return sync_to_async(attr, thread_sensitive=False)
+
+
+_client = None
+_client_lock = threading.Lock()
+breaker = CircuitBreaker(
+    failure_threshold=getattr(settings, 'BOOKING_REDIS_BREAKER_THRESHOLD', 3),
+    reset_timeout=getattr(settings, 'BOOKING_REDIS_BREAKER_RESET', 30),
+)
+
+
+def _pool_options():
+    return {
+        'decode_responses': True,
+        'max_connections': getattr(settings, 'BOOKING_REDIS_MAX_CONNECTIONS', 50),
+        # ping idle connections before reuse and reconnect if dead
+        'health_check_interval': 30,
+        'socket_connect_timeout': 1,
+        'socket_timeout': 1,
+        'retry_on_timeout': True,
+    }
+
+
+def init_redis_client():
+    """Build the process-wide pooled Redis client. Called from ``BookingConfig.ready``."""
+    global _client
+    url = getattr(settings, 'UPSTASH_REDIS_URL', None)
     if not url:
         return None
-    try:
-        import redis
-        return redis.from_url(url, decode_responses=True)
-    except Exception:
+    with _client_lock:
+        if _client is None:
+            try:
+                import redis
+                pool = redis.ConnectionPool.from_url(url, **_pool_options())
+                _client = redis.Redis(connection_pool=pool)
+            except Exception:
+                return None
+    return _client
+
+
+def _get_redis_client():
+    if not breaker.allow():
         return None
+    client = _client or init_redis_client()
+    if client is None:
+        return None
+    return _GuardedRedis(client, breaker)
+
 
+async def _aget_redis_client():
+    if not breaker.allow():
+        return None
+    client = _client or init_redis_client()
+    if client is None:
+        return None
+    return _AsyncGuardedRedis(client, breaker)
 
-def set_remaining_cache(remaining, ttl=5):
+
+def set_remaining_cache(remaining, ttl=None):
     client = _get_redis_client()
     if not client:
         return False
     try:
-        client.set('remaining_seats', str(remaining), ex=ttl)
+        client.set(REMAINING_KEY, str(remaining), ex=ttl or settings.BOOKING_REMAINING_CACHE_TTL)
+        return True
+    except Exception:
+        return False
+
+
+async def aset_remaining_cache(remaining):
+    """Write the absolute count returned by a book/cancel through to the cache.
+
+    A plain SET rather than a relative delta, so a stale value left by a
+    racing miss-fill is overwritten instead of carried forward.
+    """
+    client = await _aget_redis_client()
+    if not client:
+        return False
+    try:
+        await client.set(REMAINING_KEY, str(remaining), ex=settings.BOOKING_REMAINING_CACHE_TTL)
         return True
     except Exception:
         return False
 
 
+def _fill_ttl():
+    # a miss-fill may race a booking and store an old count; keep it short-lived
+    return getattr(settings, 'BOOKING_REMAINING_FILL_TTL', 5)
+
+
 def get_remaining_seats():
     """Return remaining seats. Prefer Redis cache, but fallback to DB if Redis unavailable.
 
-    Always compute from DB when Redis is not available. If Redis is available,
-    try to read cached value; if missing, compute from DB and set cache.
+    Every book/cancel writes its absolute count to the cache. On a miss (or with
+    Redis down) the count comes from the BookingStats row and is put back into
+    the cache for ``BOOKING_REMAINING_FILL_TTL`` seconds only, since a booking
+    may commit between that read and the write.
     """
     client = _get_redis_client()
     if client:
         try:
-            val = client.get('remaining_seats')
+            val = client.get(REMAINING_KEY)
             if val is not None:
                 return int(val)
         except Exception:
             client = None
     try:
-        booked = Bookings.objects.count()
+        remaining = BookingStats.remaining_seats()
     except Exception as e:
         raise DatabaseError("Unable to read bookings from DB") from e
 
-    remaining = TOTAL_CAPACITY - booked
-
     # Update Redis cache if possible
     if client:
         try:
-            # short TTL to keep it fresh under burst
-            client.set('remaining_seats', str(remaining), ex=5)
+            client.set(REMAINING_KEY, str(remaining), ex=_fill_ttl(), nx=True)
+        except Exception:
+            pass
+
+    return remaining
+
+
+async def aget_remaining_seats():
+    """Async counterpart of ``get_remaining_seats`` for the async booking views."""
+    client = await _aget_redis_client()
+    if client:
+        try:
+            val = await client.get(REMAINING_KEY)
+            if val is not None:
+                return int(val)
+        except Exception:
+            client = None
+    try:
+        remaining = await BookingStats.aremaining_seats()
+    except Exception as e:
+        raise DatabaseError("Unable to read bookings from DB") from e
+
+    if client:
+        try:
+            await client.set(REMAINING_KEY, str(remaining), ex=_fill_ttl(), nx=True)
         except Exception:
             pass
 
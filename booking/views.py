@@ -1,119 +1,181 @@
 import json
-import os
-from django.db import transaction, IntegrityError, connection
+from django.conf import settings
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.db import transaction
 from django.http import JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
 from django.shortcuts import get_object_or_404
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
-from django.contrib.auth import get_user_model
-from .models import Bookings
-from .utils import get_remaining_seats, TOTAL_CAPACITY, set_remaining_cache
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from .broadcast import broadcaster
+from .checkin import bulk_check_in
+from .models import Bookings, BookingStats
+from .reservation import get_reservation_engine, ReservationError
+from .utils import aget_remaining_seats, aset_remaining_cache
+from .idempotency import idempotent
+from .waiting_room import waiting_room, InvalidQueueToken
 
 User = get_user_model()
 
-def _broadcast_remaining(remaining):
-    try:
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)('booking_updates', {
-            'type': 'count.update',
-            'remaining': remaining,
-        })
-    except Exception:
-        # Swallow channel errors; booking correctness relies on DB
-        pass
-    # update redis cache if possible (best-effort)
+_jwt_auth = JWTAuthentication()
+
+
+async def _authenticate(request):
+    """Resolve the user the way DRF would: JWT bearer token first, then the session."""
     try:
-        set_remaining_cache(remaining)
-    except Exception:
-        pass
+        result = await sync_to_async(_jwt_auth.authenticate)(request)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    if result is not None:
+        return result[0]
+    user = await request.auser()
+    if not user.is_authenticated:
+        return None
+    # session-authenticated writes still need a valid CSRF token, as in DRF
+    if request.method == 'POST':
+        if CsrfViewMiddleware(lambda r: None).process_view(request, None, (), {}) is not None:
+            return None
+    return user
 
 
-def _acquire_db_lock():
-    """Acquire a transactional advisory lock on Postgres to serialize booking operations.
+def async_login_required(view):
+    """Async replacement for ``@permission_classes([IsAuthenticated])``."""
+    @csrf_exempt
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await _authenticate(request)
+        if user is None:
+            return JsonResponse(
+                {'detail': 'Authentication credentials were not provided.'},
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+        request.user = user
+        return await view(request, *args, **kwargs)
+    return wrapper
 
-    Falls back to no-op on non-Postgres DBs.
-    """
-    try:
-        with connection.cursor() as cursor:
-            # use a constant key; this call blocks until lock acquired for transaction
-            cursor.execute('SELECT pg_advisory_xact_lock(%s);', [42])
-    except Exception:
-        # Non-Postgres DB or advisory locks unavailable: continue without crash.
-        pass
 
+def _payload(request):
+    if request.content_type == 'application/json':
+        try:
+            return json.loads(request.body or b'{}')
+        except ValueError:
+            return {}
+    return request.POST
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def book_seat(request):
-    student = request.user
-    year = request.data.get('year')
 
-    with transaction.atomic():
-        # serialize critical section
-        _acquire_db_lock()
+async def _broadcast_remaining(remaining):
+    # coalesced and flushed on this event loop; never blocks the request
+    await broadcaster.apublish(remaining)
 
-        # ensure student hasn't already booked
-        if Bookings.objects.filter(student=student).exists():
-            return JsonResponse({'detail': 'Student already booked.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # compute remaining from DB truth
-        current_count = Bookings.objects.count()
-        remaining = TOTAL_CAPACITY - current_count
-        if remaining <= 0:
-            return JsonResponse({'detail': 'Capacity full.'}, status=status.HTTP_400_BAD_REQUEST)
+async def _admission_error(request, payload):
+    """Return an error response unless the student's queue token is admitted."""
+    token = request.headers.get('X-Queue-Token') or payload.get('queue_token')
+    if not token:
+        return JsonResponse({'detail': 'Join the queue first.'}, status=status.HTTP_428_PRECONDITION_REQUIRED)
+    try:
+        ticket = waiting_room.ticket_for(token, request.user)
+        position = await waiting_room.aposition(ticket)
+    except InvalidQueueToken:
+        return JsonResponse({'detail': 'Invalid queue token.'}, status=status.HTTP_400_BAD_REQUEST)
+    if position > 0:
+        return JsonResponse(
+            {'detail': 'Waiting for admission.', 'position': position},
+            status=status.HTTP_429_TOO_MANY_REQUESTS,
+        )
+    return None
 
-        try:
-            booking = Bookings.objects.create(student=student, year=year or '')
-        except IntegrityError:
-            return JsonResponse({'detail': 'Booking conflict.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # new remaining
-        new_remaining = TOTAL_CAPACITY - Bookings.objects.count()
+@require_POST
+@async_login_required
+@idempotent
+async def book_seat(request):
+    student = request.user
+    payload = _payload(request)
 
-    # broadcast outside transaction
-    _broadcast_remaining(new_remaining)
+    if waiting_room.enabled:
+        error = await _admission_error(request, payload)
+        if error is not None:
+            return error
+
+    try:
+        new_remaining = await get_reservation_engine().areserve(student, student.year or '')
+    except ReservationError as e:
+        return JsonResponse({'detail': e.detail}, status=e.status_code)
+
+    # write through to the cached count, then broadcast outside transaction
+    await aset_remaining_cache(new_remaining)
+    await _broadcast_remaining(new_remaining)
 
     return JsonResponse({'success': True, 'remaining': new_remaining}, status=status.HTTP_201_CREATED)
 
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def cancel_booking(request):
+@require_POST
+@async_login_required
+@idempotent
+async def cancel_booking(request):
     student = request.user
 
-    with transaction.atomic():
-        _acquire_db_lock()
-        booking = Bookings.objects.filter(student=student).first()
-        if not booking:
-            return JsonResponse({'detail': 'No booking found.'}, status=status.HTTP_404_NOT_FOUND)
-        booking.delete()
-        new_remaining = TOTAL_CAPACITY - Bookings.objects.count()
-
-    _broadcast_remaining(new_remaining)
+    try:
+        new_remaining = await get_reservation_engine().arelease(student)
+    except ReservationError as e:
+        return JsonResponse({'detail': e.detail}, status=e.status_code)
+
+    await aset_remaining_cache(new_remaining)
+    await _broadcast_remaining(new_remaining)
     return JsonResponse({'success': True, 'remaining': new_remaining}, status=status.HTTP_200_OK)
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def get_remaining(request):
+@require_POST
+@async_login_required
+async def queue_join(request):
+    """Take a place in the booking waiting room."""
+    token, ticket = await sync_to_async(waiting_room.join)(request.user)
+    position = await waiting_room.aposition(ticket)
+    return JsonResponse({
+        'token': token,
+        'ticket': ticket.number,
+        'position': position,
+        'admitted': position == 0,
+    })
+
+
+@require_GET
+@async_login_required
+async def queue_status(request):
+    try:
+        ticket = waiting_room.ticket_for(request.GET.get('token', ''), request.user)
+        position = await waiting_room.aposition(ticket)
+    except InvalidQueueToken:
+        return JsonResponse({'detail': 'Invalid queue token.'}, status=status.HTTP_400_BAD_REQUEST)
+    return JsonResponse({'ticket': ticket.number, 'position': position, 'admitted': position == 0})
+
+
+@require_GET
+@async_login_required
+async def get_remaining(request):
     try:
-        remaining = get_remaining_seats()
+        remaining = await aget_remaining_seats()
     except Exception:
         # fallback to DB
-        remaining = TOTAL_CAPACITY - Bookings.objects.count()
+        remaining = await BookingStats.aremaining_seats()
     return JsonResponse({'remaining': remaining})
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def my_booking(request):
+@require_GET
+@async_login_required
+async def my_booking(request):
     student = request.user
-    print(request)
-    booking = Bookings.objects.filter(student=student).first()
+    booking = await Bookings.objects.filter(student=student).afirst()
     if not booking:
         return JsonResponse({'booking': None}, status=status.HTTP_404_NOT_FOUND)
     url = "127.0.0.1:8000"
@@ -151,6 +213,7 @@ def get_booking_by_moodle(request, moodleID):
         },
         'registered_on': booking.registered_on.isoformat(),
         'attended': booking.attended,
+        'attended_at': booking.attended_at.isoformat() if booking.attended_at else None,
         'can_mark': bool(request.user.is_staff or request.user.is_superuser),
     }
     return JsonResponse(data)
@@ -169,7 +232,53 @@ def mark_present(request, moodleID):
     if not booking:
         return JsonResponse({'detail': 'No booking found.'}, status=status.HTTP_404_NOT_FOUND)
 
-    booking.attended = True
-    booking.save()
+    with transaction.atomic():
+        # only the first scan counts towards attendance
+        if Bookings.objects.filter(pk=booking.pk, attended=False).update(attended=True, attended_at=timezone.now()):
+            BookingStats.record(booking.year, attended=1)
 
     return JsonResponse({'success': True, 'attended': True})
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_mark_present(request):
+    """Check in a batch of scans: {"scans": [{"moodleID": 123, "scanned_at": "<ISO time>"}, ...]}.
+
+    Plain moodleIDs are accepted in place of scan objects. Staff/superuser only.
+    """
+    if not (request.user.is_staff or request.user.is_superuser):
+        return JsonResponse({'detail': 'Not authorized.'}, status=status.HTTP_403_FORBIDDEN)
+
+    scans = request.data.get('scans') if isinstance(request.data, dict) else request.data
+    if not isinstance(scans, list) or not scans:
+        return JsonResponse({'detail': 'scans must be a non-empty list.'}, status=status.HTTP_400_BAD_REQUEST)
+    max_batch = settings.BOOKING_CHECKIN_MAX_BATCH
+    if len(scans) > max_batch:
+        return JsonResponse(
+            {'detail': f'At most {max_batch} scans per request.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    results = bulk_check_in(scans)
+    checked_in = sum(1 for r in results if r['status'] == 'checked_in')
+    return JsonResponse({'checked_in': checked_in, 'results': results})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def booking_stats(request):
+    """Live booking and attendance numbers, overall and per year. Staff only."""
+    if not (request.user.is_staff or request.user.is_superuser):
+        return JsonResponse({'detail': 'Not authorized.'}, status=status.HTTP_403_FORBIDDEN)
+
+    data = {
+        row.key: {
+            'capacity': row.capacity,
+            'booked': row.booked,
+            'remaining': row.remaining,
+            'attended': row.attended,
+        }
+        for row in BookingStats.objects.all()
+    }
+    return JsonResponse(data)
@@ -0,0 +1,200 @@
+"""Virtual waiting room for booking openings.
+
+When ``BOOKING_WAITING_ROOM_ENABLED`` is on, a student first joins the queue
+and gets a signed token carrying an ordered ticket number. Tickets are
+admitted first-come-first-served at ``BOOKING_ADMISSION_RATE`` per second
+(after an initial ``BOOKING_ADMISSION_BURST``), counted from the moment the
+first ticket is issued. ``book_seat`` only accepts admitted tokens, so the
+database sees a bounded stream of writes instead of everyone at once.
+
+Tickets live in Redis when it is reachable, otherwise in a per-process
+stand-in that keeps the same ordering guarantees within one worker.
+
+Every reset of the queue starts a new generation. The generation is stored
+next to the admission clock and signed into each token. Workers cache the
+clock per generation and re-read it when a token from a newer generation
+arrives, or after ``BOOKING_QUEUE_CLOCK_REFRESH`` seconds. Tokens from an
+older generation are rejected.
+"""
+import itertools
+import threading
+import time
+from collections import namedtuple
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from .utils import _get_redis_client
+
+TOKEN_SALT = 'booking.waiting_room'
+
+# Return the student's existing ticket or issue the next one, and start the
+# admission clock on the first ticket. Also returns the queue generation.
+_TAKE_TICKET = """
+local generation = redis.call('get', KEYS[4]) or '0'
+local ticket = redis.call('get', KEYS[1])
+if ticket then return {ticket, generation} end
+ticket = redis.call('incr', KEYS[2])
+redis.call('set', KEYS[1], ticket, 'EX', ARGV[1])
+redis.call('setnx', KEYS[3], ARGV[2])
+return {ticket, generation}
+"""
+
+QueueTicket = namedtuple('QueueTicket', ['number', 'generation'])
+# the admission clock of one queue generation; opened_at is None until the first ticket
+QueueClock = namedtuple('QueueClock', ['generation', 'opened_at'])
+
+
+class InvalidQueueToken(Exception):
+    pass
+
+
+class LocalQueueBackend:
+    """In-process stand-in for the Redis queue."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def take_ticket(self, student_id, ttl):
+        with self._lock:
+            if student_id not in self._tickets:
+                self._tickets[student_id] = next(self._counter)
+                if self._opened_at is None:
+                    self._opened_at = time.time()
+            return QueueTicket(self._tickets[student_id], self._generation)
+
+    def clock(self):
+        return QueueClock(self._generation, self._opened_at)
+
+    def reset(self):
+        self._generation = getattr(self, '_generation', -1) + 1
+        self._counter = itertools.count(1)
+        self._tickets = {}
+        self._opened_at = None
+
+
+class RedisQueueBackend:
+    ticket_key = 'booking:queue:student:{}'
+    tail_key = 'booking:queue:tail'
+    opened_key = 'booking:queue:opened_at'
+    generation_key = 'booking:queue:generation'
+
+    def __init__(self, client):
+        self.client = client
+
+    def take_ticket(self, student_id, ttl):
+        ticket, generation = self.client.eval(
+            _TAKE_TICKET, 4,
+            self.ticket_key.format(student_id), self.tail_key, self.opened_key, self.generation_key,
+            ttl, time.time(),
+        )
+        return QueueTicket(int(ticket), int(generation))
+
+    def clock(self):
+        generation, opened_at = self.client.mget(self.generation_key, self.opened_key)
+        return QueueClock(int(generation or 0), float(opened_at) if opened_at is not None else None)
+
+    def reset(self):
+        keys = list(self.client.scan_iter(self.ticket_key.format('*')))
+        pipe = self.client.pipeline()
+        pipe.delete(self.tail_key, self.opened_key, *keys)
+        # never deleted, so tokens from earlier openings stay recognisable
+        pipe.incr(self.generation_key)
+        pipe.execute()
+
+
+class WaitingRoom:
+
+    def __init__(self):
+        self.local = LocalQueueBackend()
+        self._clock = None
+        self._clock_read_at = 0.0
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'BOOKING_WAITING_ROOM_ENABLED', False)
+
+    @property
+    def rate(self):
+        return getattr(settings, 'BOOKING_ADMISSION_RATE', 50)
+
+    @property
+    def burst(self):
+        return getattr(settings, 'BOOKING_ADMISSION_BURST', 50)
+
+    @property
+    def clock_refresh(self):
+        return getattr(settings, 'BOOKING_QUEUE_CLOCK_REFRESH', 5)
+
+    @property
+    def token_ttl(self):
+        return getattr(settings, 'BOOKING_QUEUE_TOKEN_TTL', 60 * 60)
+
+    def _call(self, method, *args):
+        client = _get_redis_client()
+        if client is not None:
+            try:
+                return getattr(RedisQueueBackend(client), method)(*args)
+            except Exception:
+                pass
+        return getattr(self.local, method)(*args)
+
+    def join(self, student):
+        """Issue (or re-issue) ``student``'s ticket. Returns ``(token, ticket)``."""
+        ticket = self._call('take_ticket', student.pk, self.token_ttl)
+        token = signing.dumps({'t': ticket.number, 'g': ticket.generation, 's': student.pk}, salt=TOKEN_SALT)
+        return token, ticket
+
+    def ticket_for(self, token, student=None):
+        """Verify ``token`` (and that it belongs to ``student``, if given) and return its ``QueueTicket``."""
+        try:
+            data = signing.loads(token, salt=TOKEN_SALT, max_age=self.token_ttl)
+        except signing.BadSignature:
+            raise InvalidQueueToken()
+        if student is not None and data.get('s') != student.pk:
+            raise InvalidQueueToken()
+        return QueueTicket(data['t'], data.get('g', 0))
+
+    def _clock_is_fresh(self, generation):
+        # a token from a newer generation means the queue was reset elsewhere
+        return (
+            self._clock is not None
+            and self._clock.opened_at is not None
+            and generation <= self._clock.generation
+            and time.monotonic() - self._clock_read_at < self.clock_refresh
+        )
+
+    def _read_clock(self):
+        self._clock = self._call('clock')
+        self._clock_read_at = time.monotonic()
+        return self._clock
+
+    def admitted_upto(self, generation):
+        """Highest ticket number of ``generation`` allowed to book right now."""
+        clock = self._clock if self._clock_is_fresh(generation) else self._read_clock()
+        if generation != clock.generation:
+            raise InvalidQueueToken()
+        if clock.opened_at is None:
+            return self.burst
+        return self.burst + int((time.time() - clock.opened_at) * self.rate)
+
+    def position(self, ticket):
+        """Tickets still ahead of ``ticket``; 0 means admitted.
+
+        Raises ``InvalidQueueToken`` for a ticket from an earlier opening.
+        """
+        return max(0, ticket.number - self.admitted_upto(ticket.generation))
+
+    async def aposition(self, ticket):
+        # the cached clock answers without I/O; only a refresh needs a thread
+        if not self._clock_is_fresh(ticket.generation):
+            return await sync_to_async(self.position)(ticket)
+        return self.position(ticket)
+
+    def reset(self):
+        self._call('reset')
+        self.local.reset()
+        self._clock = None
+
+
+waiting_room = WaitingRoom()
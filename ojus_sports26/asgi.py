@@ -19,12 +19,14 @@ django_asgi_app = get_asgi_application()
 
 # Import websocket routes lazily
 from booking import routing as booking_routing
+from sports import routing as sports_routing
 
 application = ProtocolTypeRouter({
 	"http": django_asgi_app,
 	"websocket": AuthMiddlewareStack(
 		URLRouter(
 			booking_routing.websocket_urlpatterns
+			+ sports_routing.websocket_urlpatterns
 		)
 	),
 })
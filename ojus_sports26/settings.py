@@ -203,4 +203,94 @@ else:
         "default": {
             "BACKEND": "channels.layers.InMemoryChannelLayer",
         },
-    }
\ No newline at end of file
+    }
+
+## CACHE
+# Shared Redis cache when available so every worker sees the same entries;
+# otherwise a per-process in-memory cache.
+if UPSTASH_REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": UPSTASH_REDIS_URL,
+        },
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+    }
+# Caches that hold permissions, registration windows or counters invalidate
+# in one worker only unless the cache is shared; they read the DB otherwise.
+CACHE_IS_SHARED = bool(UPSTASH_REDIS_URL)
+
+## LEADERBOARD
+# Seconds a rendered leaderboard stays cached. Entries are keyed by standings
+# version, so this only bounds drift from changes no view reports (e.g. a
+# player renaming themselves).
+LEADERBOARD_CACHE_TTL = 300
+# Directory for static leaderboard snapshots (see sports.snapshots). Serve it
+# from a CDN or static host; blobs are content-hashed and can be cached
+# forever, only manifest.json needs revalidation. Unset to disable.
+LEADERBOARD_SNAPSHOT_ROOT = os.environ.get('LEADERBOARD_SNAPSHOT_ROOT') or None
+# Seconds changes are collected before the snapshots are rewritten in the background.
+LEADERBOARD_SNAPSHOT_DELAY = 1.0
+# Seconds the per-sport student -> branch map used for player results stays cached.
+SPORTS_BRANCH_CACHE_TTL = 60 * 60
+# Seconds a user's coordinated sport ids stay cached (also dropped when coordinators change).
+SPORTS_ROLE_CACHE_TTL = 10 * 60
+# Seconds the compiled PointsScheme table stays cached (it is also dropped on change).
+SPORTS_POINTS_CACHE_TTL = 5 * 60
+# Largest batch accepted by leaderboard/score-events/.
+SCORE_EVENTS_MAX_BATCH = 200
+
+## REGISTRATION
+# Global switch for new sport registrations; per-sport windows and caps live on Sport.
+SPORTS_REGISTRATION_OPEN = os.environ.get('SPORTS_REGISTRATION_OPEN', '1') == '1'
+# Seconds the registration windows and per-sport counters stay cached.
+SPORTS_REGISTRATION_CACHE_TTL = 10 * 60
+
+## BOOKING
+# Engine that performs the capacity check and insert for seat bookings.
+# Use 'booking.reservation.RedisReservationEngine' to gate bookings in Redis first.
+BOOKING_RESERVATION_ENGINE = os.environ.get(
+    'BOOKING_RESERVATION_ENGINE', 'booking.reservation.DatabaseReservationEngine'
+)
+
+# Seat inventory defaults used by `manage.py provision_seats`.
+BOOKING_TOTAL_CAPACITY = int(os.environ.get('BOOKING_TOTAL_CAPACITY', 5))
+BOOKING_INVENTORY_SHARDS = int(os.environ.get('BOOKING_INVENTORY_SHARDS', 8))
+# Seats reserved per year, e.g. {'FE': 100}. Years without a quota share the rest.
+BOOKING_YEAR_QUOTAS = {}
+
+# Pooled Redis client used by the booking app (see booking.utils).
+BOOKING_REDIS_MAX_CONNECTIONS = 50
+# Consecutive Redis failures before the circuit breaker opens, and seconds it stays open.
+BOOKING_REDIS_BREAKER_THRESHOLD = 3
+BOOKING_REDIS_BREAKER_RESET = 30
+# The seat count is written through on book/cancel; the TTL only bounds drift
+# from writes made outside the booking views (e.g. the admin).
+BOOKING_REMAINING_CACHE_TTL = 600
+# Cache misses are refilled from the DB for only this long, since the read can
+# race a booking.
+BOOKING_REMAINING_FILL_TTL = 5
+# Minimum seconds between COUNT_UPDATE broadcasts; updates in between are coalesced.
+BOOKING_BROADCAST_INTERVAL = 0.2
+# Waiting room for booking openings (see booking.waiting_room). When enabled,
+# book requests need an admitted queue token; tickets are admitted at
+# BOOKING_ADMISSION_RATE per second after the first BOOKING_ADMISSION_BURST.
+BOOKING_WAITING_ROOM_ENABLED = os.environ.get('BOOKING_WAITING_ROOM_ENABLED', '') == '1'
+BOOKING_ADMISSION_RATE = 50
+BOOKING_ADMISSION_BURST = 50
+BOOKING_QUEUE_TOKEN_TTL = 60 * 60
+# Seconds a worker trusts its cached admission clock before re-reading it.
+BOOKING_QUEUE_CLOCK_REFRESH = 5
+# Seconds between QUEUE_POSITION messages on ws/bookings/.
+BOOKING_QUEUE_POSITION_INTERVAL = 1
+# Responses to book/cancel requests carrying an Idempotency-Key are replayed
+# for this many seconds; the LRU size applies when Redis is unavailable.
+BOOKING_IDEMPOTENCY_TTL = 24 * 60 * 60
+BOOKING_IDEMPOTENCY_LOCAL_SIZE = 10000
+# Largest batch accepted by /booking/check-in/bulk/.
+BOOKING_CHECKIN_MAX_BATCH = 1000
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Sport, Registration, Team, TeamRequest, Results
+from .models import Sport, Registration, Team, TeamRequest, Results, DepartmentStanding, PointsScheme, Match
 
 @admin.register(Sport)
 class SportAdmin(admin.ModelAdmin):
@@ -13,12 +13,16 @@ class SportAdmin(admin.ModelAdmin):
     is_team_sport.short_description = 'Team Sport'
     is_team_sport.boolean = True  # This will display a nice checkmark icon
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('primary', 'secondary')
+
     def primary_coordinator(self, obj):
-        return str(obj.primary)
+        # primary is a ManyToManyField
+        return ', '.join(str(user) for user in obj.primary.all())
     primary_coordinator.short_description = 'Primary Coordinator'
     
     def get_secondary_count(self, obj):
-        return obj.secondary.count()
+        return len(obj.secondary.all())
     get_secondary_count.short_description = 'Secondary Coordinators'
 
 @admin.register(Registration)
@@ -41,4 +45,20 @@ class TeamAdmin(admin.ModelAdmin):
     get_members_count.short_description = 'Team Members'
 
 admin.site.register(TeamRequest)
-admin.site.register(Results)
\ No newline at end of file
+admin.site.register(Results)
+
+@admin.register(DepartmentStanding)
+class DepartmentStandingAdmin(admin.ModelAdmin):
+    list_display = ('rank', 'branch', 'total_points', 'updated_at')
+    readonly_fields = ('branch', 'total_points', 'rank', 'breakdown', 'updated_at')
+
+
+@admin.register(PointsScheme)
+class PointsSchemeAdmin(admin.ModelAdmin):
+    list_display = ('category', 'points')
+
+
+@admin.register(Match)
+class MatchAdmin(admin.ModelAdmin):
+    list_display = ('sport', 'format', 'round', 'slot', 'home', 'away', 'winner', 'played')
+    list_filter = ('sport', 'format', 'played')
@@ -0,0 +1,113 @@
+"""Registration window and capacity gate.
+
+Every sport's registration window (``registration_opens`` /
+``registration_closes``) and ``max_registrations`` are kept in one cached
+``slug -> SportWindow`` map, rebuilt after any sport change. Each capped sport
+also has a registration counter in the cache, seeded from the database the
+first time it is needed and moved with ``incr``/``decr``. As a result, a closed,
+unopened or full sport is turned away without a database query. Deleting a
+registration drops the counter so it is reseeded. Registrations added outside
+the API (e.g. the admin) are only counted once the counter expires.
+
+A slug missing from the map (a sport created or renamed since it was built)
+is looked up in the database. Without a shared cache (``CACHE_IS_SHARED``)
+invalidation would only reach one worker, so windows and counts are then
+read from the database on every registration.
+"""
+from collections import namedtuple
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from .caching import cache_is_shared
+from .models import Registration, Sport
+
+KEY = 'sports:registration_windows'
+COUNT_KEY = 'sports:registration_count:{}'
+WINDOW_FIELDS = ('id', 'registration_opens', 'registration_closes', 'max_registrations')
+
+SportWindow = namedtuple('SportWindow', ['sport_id', 'opens', 'closes', 'limit'])
+
+
+class RegistrationClosed(Exception):
+
+    def __init__(self, detail):
+        super().__init__(detail)
+        self.detail = detail
+
+
+class RegistrationGate:
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'SPORTS_REGISTRATION_CACHE_TTL', 10 * 60)
+
+    def windows(self):
+        windows = cache.get(KEY)
+        if windows is None:
+            windows = {
+                slug: SportWindow(*row)
+                for slug, *row in Sport.objects.values_list('slug', *WINDOW_FIELDS)
+            }
+            cache.set(KEY, windows, self.ttl)
+        return windows
+
+    def _load(self, slug):
+        row = Sport.objects.filter(slug=slug).values_list(*WINDOW_FIELDS).first()
+        return SportWindow(*row) if row else None
+
+    def window_for(self, slug):
+        if not cache_is_shared():
+            return self._load(slug)
+        window = self.windows().get(slug)
+        if window is None:
+            window = self._load(slug)
+            if window is not None:
+                # the map predates this sport (or its slug); rebuild it next time
+                self.invalidate()
+        return window
+
+    def check(self, window, now=None):
+        """Raise ``RegistrationClosed`` unless ``window`` is open at ``now``."""
+        now = now or timezone.now()
+        if window.opens and now < window.opens:
+            raise RegistrationClosed("Registrations for this sport have not opened yet.")
+        if window.closes and now >= window.closes:
+            raise RegistrationClosed("Registrations for this sport are closed.")
+
+    def admit(self, window):
+        """Check the window and take a place; pair with ``release`` if the insert fails."""
+        self.check(window)
+        if window.limit is None:
+            return
+        if not cache_is_shared():
+            if Registration.objects.filter(sport_id=window.sport_id).count() >= window.limit:
+                raise RegistrationClosed("Registrations for this sport are full.")
+            return
+        key = COUNT_KEY.format(window.sport_id)
+        if cache.get(key) is None:
+            cache.add(key, Registration.objects.filter(sport_id=window.sport_id).count(), self.ttl)
+        try:
+            taken = cache.incr(key)
+        except ValueError:
+            # expired between add and incr; let this one through
+            return
+        if taken > window.limit:
+            cache.decr(key)
+            raise RegistrationClosed("Registrations for this sport are full.")
+
+    def release(self, window):
+        if window.limit is None or not cache_is_shared():
+            return
+        try:
+            cache.decr(COUNT_KEY.format(window.sport_id))
+        except ValueError:
+            pass
+
+    def forget_count(self, sport_id):
+        cache.delete(COUNT_KEY.format(sport_id))
+
+    def invalidate(self):
+        cache.delete(KEY)
+
+
+registration_gate = RegistrationGate()
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SportsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'sports'
+
+    def ready(self):
+        # registers the results sync and standings version receivers
+        from . import results, signals  # noqa: F401
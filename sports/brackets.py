@@ -0,0 +1,232 @@
+"""Bracket generation and standings from match outcomes.
+
+A bracket is a set of ``Match`` rows whose entrants are the sport's
+``Results``. Seeding and ranking work on plain tuples loaded with a single
+query (``(round, slot, home, away, winner, home_score, away_score, played)``),
+so recording one outcome costs a couple of row updates, one read of the
+bracket and a ``bulk_update`` of the positions that actually moved.
+
+Knockout: entrants are seeded by their current position, byes go to the top
+seeds, and an entrant knocked out in round ``r`` of ``R`` finishes
+``2 ** (R - r) + 1`` (so semi-final losers share 3rd). An entrant still in the
+draw holds that position for the round it has reached, the finish it is
+already sure of, so an unfinished bracket earns no first-place points; only
+the winner of the final is 1st.
+
+Round robin: 2 points for a win and 1 for a draw, ties broken by score
+difference and then score for; equal records share a position.
+"""
+from django.db import transaction
+from .leaderboards import publish_results
+from .models import Match, Results
+from .points import assign_points
+from .signals import standings_changed
+
+MATCH_FIELDS = ('round', 'slot', 'home_id', 'away_id', 'winner_id', 'home_score', 'away_score', 'played')
+
+
+class BracketError(Exception):
+
+    def __init__(self, detail):
+        super().__init__(detail)
+        self.detail = detail
+
+
+def seed_order(size):
+    """Seed numbers in draw order for a power-of-two ``size``; seeds 1 and 2 can only meet in the final."""
+    order = [1]
+    while len(order) < size:
+        total = len(order) * 2 + 1
+        order = [seed for s in order for seed in (s, total - s)]
+    return order
+
+
+def knockout_fixtures(entrants):
+    """``(round, slot, home, away, winner)`` for a full single-elimination draw."""
+    size = 2
+    while size < len(entrants):
+        size *= 2
+    rounds = size.bit_length() - 1
+    seeded = [entrants[s - 1] if s <= len(entrants) else None for s in seed_order(size)]
+
+    fixtures = {}
+    for slot in range(size // 2):
+        home, away = seeded[2 * slot], seeded[2 * slot + 1]
+        # a bye advances the entrant straight away
+        winner = home if away is None else (away if home is None else None)
+        fixtures[(1, slot)] = [home, away, winner]
+    for rnd in range(2, rounds + 1):
+        for slot in range(size >> rnd):
+            fixtures[(rnd, slot)] = [None, None, None]
+    for slot in range(size // 2):
+        winner = fixtures[(1, slot)][2]
+        if winner is not None and rounds > 1:
+            fixtures[(2, slot // 2)][slot % 2] = winner
+    return [(rnd, slot, *sides) for (rnd, slot), sides in sorted(fixtures.items())]
+
+
+def round_robin_fixtures(entrants):
+    """``(round, slot, home, away, None)`` using the circle method."""
+    players = list(entrants) + ([None] if len(entrants) % 2 else [])
+    fixtures = []
+    for rnd in range(1, len(players)):
+        pairs = [(players[i], players[-1 - i]) for i in range(len(players) // 2)]
+        pairs = [pair for pair in pairs if None not in pair]
+        fixtures.extend((rnd, slot, home, away, None) for slot, (home, away) in enumerate(pairs))
+        players = [players[0], players[-1], *players[1:-1]]
+    return fixtures
+
+
+def knockout_positions(matches):
+    rounds = max(m[0] for m in matches)
+    # a loser's last round is the one it lost; survivors are in their current one
+    reached = {}
+    champion = None
+    for rnd, _, home, away, winner, *_ in matches:
+        for side in (home, away):
+            if side is not None:
+                reached[side] = max(reached.get(side, 0), rnd)
+        if rnd == rounds and winner is not None:
+            champion = winner
+    positions = {entrant: 2 ** (rounds - rnd) + 1 for entrant, rnd in reached.items()}
+    if champion is not None:
+        positions[champion] = 1
+    return positions
+
+
+def round_robin_positions(matches):
+    table = {}
+    for _, _, home, away, winner, home_score, away_score, played in matches:
+        for side in (home, away):
+            table.setdefault(side, [0, 0, 0])
+        if not played:
+            continue
+        if winner is None:
+            table[home][0] += 1
+            table[away][0] += 1
+        else:
+            table[winner][0] += 2
+        home_score, away_score = home_score or 0, away_score or 0
+        table[home][1] += home_score - away_score
+        table[away][1] += away_score - home_score
+        table[home][2] += home_score
+        table[away][2] += away_score
+
+    ranked = sorted(table.items(), key=lambda item: [-v for v in item[1]])
+    positions = {}
+    previous = None
+    for index, (entrant, record) in enumerate(ranked, start=1):
+        if record != previous:
+            position, previous = index, record
+        positions[entrant] = position
+    return positions
+
+
+def _load(sport):
+    return list(Match.objects.filter(sport=sport).order_by('round', 'slot').values_list(*MATCH_FIELDS))
+
+
+def apply_positions(sport, matches, fmt):
+    """Write positions (and points) derived from ``matches``; returns the changed results."""
+    if not matches:
+        return []
+    positions = knockout_positions(matches) if fmt == Match.KNOCKOUT else round_robin_positions(matches)
+    results = list(Results.objects.filter(id__in=positions).only('id', 'sport_id', 'position', 'score', 'points'))
+    moved = []
+    for result in results:
+        if result.position != positions[result.id]:
+            result.position = positions[result.id]
+            moved.append(result)
+    changed = {r.id: r for r in moved}
+    changed.update({r.id: r for r in assign_points(results)})
+    if changed:
+        Results.objects.bulk_update(list(changed.values()), ['position', 'points'])
+        standings_changed.send(sender=Match, sport_id=sport.pk)
+        publish_results(sport, list(changed.values()))
+    return list(changed.values())
+
+
+def generate_bracket(sport, fmt, reseed=False):
+    """Create the bracket for ``sport`` from its entrants, seeded by current position."""
+    if sport.is_finalized:
+        raise BracketError("Cannot generate a bracket. Sport standings are finalized.")
+    with transaction.atomic():
+        existing = Match.objects.filter(sport=sport)
+        if existing.exists():
+            if not reseed:
+                raise BracketError("A bracket already exists for this sport. Pass reseed to replace it.")
+            existing.delete()
+
+        entrants = list(Results.objects.filter(sport=sport).order_by('position', 'id').values_list('id', flat=True))
+        if len(entrants) < 2:
+            raise BracketError("At least two entrants are needed for a bracket.")
+        fixtures = knockout_fixtures(entrants) if fmt == Match.KNOCKOUT else round_robin_fixtures(entrants)
+        Match.objects.bulk_create([
+            Match(sport=sport, format=fmt, round=rnd, slot=slot, home_id=home, away_id=away,
+                  winner_id=winner, played=winner is not None)
+            for rnd, slot, home, away, winner in fixtures
+        ])
+    return Match.objects.filter(sport=sport)
+
+
+def record_outcome(match, winner_id=None, home_score=None, away_score=None):
+    """Record a played match and update standings. ``winner_id=None`` is a draw (round robin only)."""
+    sport = match.sport
+    if sport.is_finalized:
+        raise BracketError("Cannot record a match. Sport standings are finalized.")
+    if match.home_id is None or match.away_id is None:
+        raise BracketError("Both entrants of this match are not known yet.")
+    if winner_id is not None and winner_id not in (match.home_id, match.away_id):
+        raise BracketError("Winner must be one of the two entrants.")
+    knockout = match.format == Match.KNOCKOUT
+    if knockout and winner_id is None:
+        raise BracketError("Knockout matches need a winner.")
+
+    with transaction.atomic():
+        match = Match.objects.select_for_update().get(pk=match.pk)
+        if knockout:
+            rounds = Match.objects.filter(sport=sport).order_by('-round').values_list('round', flat=True).first()
+            if match.round < rounds:
+                following = Match.objects.select_for_update().get(
+                    sport=sport, round=match.round + 1, slot=match.slot // 2
+                )
+                side = 'home_id' if match.slot % 2 == 0 else 'away_id'
+                if match.winner_id != winner_id and following.played:
+                    raise BracketError("The next match was already played. Clear it before changing this result.")
+                setattr(following, side, winner_id)
+                following.save(update_fields=[side, 'updated_at'])
+
+        match.winner_id = winner_id
+        match.home_score = home_score
+        match.away_score = away_score
+        match.played = True
+        match.save(update_fields=['winner', 'home_score', 'away_score', 'played', 'updated_at'])
+        apply_positions(sport, _load(sport), match.format)
+    return match
+
+
+def clear_outcome(match):
+    """Undo a recorded match (knockout: only while the next match is unplayed)."""
+    sport = match.sport
+    if sport.is_finalized:
+        raise BracketError("Cannot change a match. Sport standings are finalized.")
+    if match.home_id is None or match.away_id is None:
+        raise BracketError("Byes cannot be cleared.")
+    with transaction.atomic():
+        match = Match.objects.select_for_update().get(pk=match.pk)
+        if match.format == Match.KNOCKOUT:
+            following = Match.objects.select_for_update().filter(
+                sport=sport, round=match.round + 1, slot=match.slot // 2
+            ).first()
+            if following is not None:
+                if following.played:
+                    raise BracketError("The next match was already played. Clear it first.")
+                side = 'home_id' if match.slot % 2 == 0 else 'away_id'
+                setattr(following, side, None)
+                following.save(update_fields=[side, 'updated_at'])
+        match.winner_id = None
+        match.home_score = match.away_score = None
+        match.played = False
+        match.save(update_fields=['winner', 'home_score', 'away_score', 'played', 'updated_at'])
+        apply_positions(sport, _load(sport), match.format)
+    return match
@@ -0,0 +1,60 @@
+"""Branch lookup for player results.
+
+A player's branch for a sport is the one on their ``Registration``. The
+resolver keeps a ``student_id -> branch`` map per sport in the cache, built
+with one query and dropped whenever a registration of that sport changes, so
+saving a result does not touch ``Registration`` at all. A student missing
+from the map (e.g. registered since it was built) is looked up directly.
+
+Without a shared cache (``CACHE_IS_SHARED``) invalidation would only reach one
+worker, so the requested students are then read from the database each time.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from .caching import cache_is_shared
+from .models import Registration
+
+KEY = 'sports:branches:{}'
+
+
+class BranchResolver:
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'SPORTS_BRANCH_CACHE_TTL', 60 * 60)
+
+    def branches_for(self, sport_id):
+        """The whole ``student_id -> branch`` map for ``sport_id``."""
+        branches = cache.get(KEY.format(sport_id))
+        if branches is None:
+            branches = dict(Registration.objects.filter(sport_id=sport_id).values_list('student_id', 'branch'))
+            cache.set(KEY.format(sport_id), branches, self.ttl)
+        return branches
+
+    def resolve(self, sport_id, student_id):
+        return self.resolve_many(sport_id, [student_id]).get(student_id)
+
+    def resolve_many(self, sport_id, student_ids):
+        """Branches for ``student_ids`` in one pass; unregistered students are left out."""
+        if not cache_is_shared():
+            return self._load(sport_id, student_ids)
+        branches = self.branches_for(sport_id)
+        found = {sid: branches[sid] for sid in student_ids if sid in branches}
+        unknown = set(student_ids) - set(found)
+        if unknown:
+            late = self._load(sport_id, unknown)
+            if late:
+                found.update(late)
+                self.invalidate(sport_id)
+        return found
+
+    def _load(self, sport_id, student_ids):
+        return dict(Registration.objects.filter(
+            sport_id=sport_id, student_id__in=student_ids
+        ).values_list('student_id', 'branch'))
+
+    def invalidate(self, sport_id):
+        cache.delete(KEY.format(sport_id))
+
+
+branch_resolver = BranchResolver()
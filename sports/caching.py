@@ -0,0 +1,45 @@
+"""Pre-rendered leaderboard responses with strong ETags.
+
+The JSON body is rendered once per cache key and stored with the MD5 of its
+bytes as the ETag. Callers put the standings version in the key, so a hit is
+always current; polls that send a matching ``If-None-Match`` get a 304.
+"""
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+from rest_framework.renderers import JSONRenderer
+
+
+def cache_is_shared():
+    """True when every worker sees the same cache (Redis), so a delete invalidates everywhere."""
+    return getattr(settings, 'CACHE_IS_SHARED', False)
+
+
+def _etag_matches(request, etag):
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    # If-None-Match uses the weak comparison
+    return '*' in etags or any(e.removeprefix('W/') == etag for e in etags)
+
+
+def cached_json_response(request, key, build):
+    """Serve the cached body for ``key``, calling ``build()`` for the data on a miss."""
+    entry = cache.get(key)
+    if entry is None:
+        content = JSONRenderer().render(build())
+        entry = ('"%s"' % hashlib.md5(content).hexdigest(), content)
+        cache.set(key, entry, getattr(settings, 'LEADERBOARD_CACHE_TTL', 300))
+    etag, content = entry
+
+    if _etag_matches(request, etag):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(content, content_type='application/json')
+    response['ETag'] = etag
+    # let browsers keep the body but always revalidate
+    response['Cache-Control'] = 'no-cache'
+    return response
@@ -0,0 +1,79 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from .leaderboards import (
+    DEPARTMENT_GROUP, sport_group, sport_standings, department_standings, standings_version
+)
+from .models import Sport
+
+
+class LeaderboardConsumer(AsyncJsonWebsocketConsumer):
+    """Live leaderboard for one sport, or the department table without a slug.
+
+    Sends a snapshot on connect (and on {"action": "snapshot"}), then the
+    deltas published by the leaderboard write views.
+    """
+    sport = None
+
+    async def connect(self):
+        slug = self.scope['url_route']['kwargs'].get('sport_slug')
+        if slug is not None:
+            self.sport = await database_sync_to_async(Sport.objects.filter(slug=slug).first)()
+            if self.sport is None:
+                await self.close()
+                return
+            self.group_name = sport_group(self.sport.pk)
+        else:
+            self.group_name = DEPARTMENT_GROUP
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        await self.send_snapshot()
+
+    async def disconnect(self, close_code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        # clients that notice a version gap ask for a fresh snapshot
+        if content.get('action') == 'snapshot':
+            await self.send_snapshot()
+
+    @database_sync_to_async
+    def build_snapshot(self):
+        if self.sport is None:
+            return {'event': 'DEPARTMENT_SNAPSHOT', 'leaderboard': department_standings()}
+        self.sport.refresh_from_db(fields=['is_finalized'])
+        return {
+            'event': 'LEADERBOARD_SNAPSHOT',
+            'sport': self.sport.slug,
+            'version': standings_version(self.sport.pk),
+            'is_finalized': self.sport.is_finalized,
+            'results': sport_standings(self.sport),
+        }
+
+    async def send_snapshot(self):
+        await self.send_json(await self.build_snapshot())
+
+    async def leaderboard_delta(self, event):
+        # handler for type "leaderboard.delta"
+        await self.send_json({
+            'event': 'RESULTS_DELTA',
+            'sport': event['sport'],
+            'version': event['version'],
+            'changes': event['changes'],
+        })
+
+    async def leaderboard_status(self, event):
+        # handler for type "leaderboard.status"
+        await self.send_json({
+            'event': 'STANDINGS_STATUS',
+            'sport': event['sport'],
+            'version': event['version'],
+            'is_finalized': event['is_finalized'],
+        })
+
+    async def department_update(self, event):
+        # handler for type "department.update"
+        await self.send_json({
+            'event': 'DEPARTMENT_UPDATE',
+            'leaderboard': event['leaderboard'],
+        })
@@ -0,0 +1,156 @@
+"""Leaderboard data and live pushes.
+
+``sport_standings`` and ``department_standings`` build the payloads served by
+the REST leaderboard views and sent as snapshots by ``LeaderboardConsumer``.
+
+Write paths call ``publish_results`` / ``publish_status`` after changing
+standings. Messages go out once the surrounding transaction commits and carry
+absolute values for the changed rows only, so a delta that overlaps a
+client's snapshot is harmless to apply twice.
+"""
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from .models import DepartmentStanding, LeaderboardVersion, Results, Sport
+from .serializers import ResultsSerializer, DepartmentLeaderboardSerializer
+
+DEPARTMENT_GROUP = 'leaderboard_department'
+
+
+def sport_group(sport_id):
+    return f'leaderboard_sport_{sport_id}'
+
+
+def sport_standings(sport):
+    # ✅ FIX: Sort by position (rank), NOT by score
+    results = Results.objects.filter(
+        sport=sport
+    ).select_related('team', 'player', 'sport').order_by('position')  # ← Changed from order_by('-score')
+    return ResultsSerializer(results, many=True).data
+
+
+def department_standings():
+    """Ranked points per branch over finalized sports, read from ``DepartmentStanding``."""
+    formatted_data = [
+        {"rank": standing.rank, "branch": standing.branch, "total_points": standing.total_points}
+        for standing in DepartmentStanding.objects.order_by('rank')
+    ]
+    # Use serializer for consistent output
+    return DepartmentLeaderboardSerializer(formatted_data, many=True).data
+
+
+def sport_contribution(sport_id):
+    """Points per branch earned in one sport."""
+    # Aggregate points by branch
+    rows = Results.objects.filter(
+        sport_id=sport_id,
+        branch__isnull=False
+    ).exclude(branch='').values('branch').annotate(total_points=Sum('points'))
+    return {row['branch']: row['total_points'] or 0 for row in rows}
+
+
+def apply_contribution(sport_id, contribution):
+    """Replace one sport's entry in every branch's breakdown, then re-rank.
+
+    ``contribution`` maps branch to points; an empty dict removes the sport.
+    Returns whether anything changed.
+    """
+    # JSON object keys are strings; ids survive a slug rename
+    key = str(sport_id)
+    with transaction.atomic():
+        standings = {s.branch: s for s in DepartmentStanding.objects.select_for_update()}
+        changed = []
+        for branch in set(standings) | set(contribution):
+            standing = standings.get(branch) or DepartmentStanding(branch=branch, breakdown={})
+            points = contribution.get(branch)
+            if standing.breakdown.get(key) == points:
+                continue
+            if points is None:
+                standing.breakdown.pop(key, None)
+            else:
+                standing.breakdown[key] = points
+            standing.total_points = sum(standing.breakdown.values())
+            standings[branch] = standing
+            changed.append(branch)
+        if not changed:
+            return False
+
+        emptied = [b for b, s in standings.items() if not s.breakdown]
+        DepartmentStanding.objects.filter(branch__in=emptied).delete()
+        ordered = sorted(
+            (s for s in standings.values() if s.breakdown),
+            key=lambda s: (-s.total_points, s.branch)
+        )
+        now = timezone.now()
+        for rank, standing in enumerate(ordered, start=1):
+            standing.rank = rank
+            standing.updated_at = now
+        new = [s for s in ordered if s._state.adding]
+        existing = [s for s in ordered if not s._state.adding]
+        DepartmentStanding.objects.bulk_create(new)
+        DepartmentStanding.objects.bulk_update(existing, ['total_points', 'rank', 'breakdown', 'updated_at'])
+        return True
+
+
+def refresh_department_standings(sport_id):
+    """Bring the sport's contribution to ``DepartmentStanding`` up to date."""
+    is_finalized = Sport.objects.filter(pk=sport_id).values_list('is_finalized', flat=True).first()
+    if is_finalized is None:
+        return False
+    if not is_finalized:
+        # common case: scoring an open sport that was never counted
+        if not DepartmentStanding.objects.filter(breakdown__has_key=str(sport_id)).exists():
+            return False
+        return apply_contribution(sport_id, {})
+    return apply_contribution(sport_id, sport_contribution(sport_id))
+
+
+def standings_version(sport_id):
+    return LeaderboardVersion.objects.filter(sport_id=sport_id).values_list('version', flat=True).first() or 0
+
+
+def _group_send(group, message):
+    try:
+        async_to_sync(get_channel_layer().group_send)(group, message)
+    except Exception:
+        # spectators resync on reconnect; never fail the write over a push
+        pass
+
+
+def publish_results(sport, results):
+    """Push the current position/score/points of ``results`` to the sport's group."""
+    changes = [
+        {'id': r.id, 'position': r.position, 'score': r.score, 'points': r.points}
+        for r in results
+    ]
+    if not changes:
+        return
+
+    def send():
+        _group_send(sport_group(sport.pk), {
+            'type': 'leaderboard.delta',
+            'sport': sport.slug,
+            'version': standings_version(sport.pk),
+            'changes': changes,
+        })
+    transaction.on_commit(send)
+
+
+def publish_status(sport):
+    """Push a finalize/unfinalize to the sport's group and the new department standings."""
+    is_finalized = sport.is_finalized
+
+    def send():
+        _group_send(sport_group(sport.pk), {
+            'type': 'leaderboard.status',
+            'sport': sport.slug,
+            'version': standings_version(sport.pk),
+            'is_finalized': is_finalized,
+        })
+        _group_send(DEPARTMENT_GROUP, {
+            'type': 'department.update',
+            'leaderboard': [dict(row) for row in department_standings()],
+        })
+    transaction.on_commit(send)
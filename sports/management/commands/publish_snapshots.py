@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand, CommandError
+from sports.snapshots import publish_all, snapshot_root
+
+
+class Command(BaseCommand):
+    help = 'Writes static JSON snapshots of every sport leaderboard and the department leaderboard'
+
+    def handle(self, *args, **options):
+        if not snapshot_root():
+            raise CommandError('LEADERBOARD_SNAPSHOT_ROOT is not set')
+        written = publish_all()
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully published {written} sport snapshots to {snapshot_root()}'
+        ))
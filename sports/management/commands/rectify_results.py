@@ -1,22 +1,93 @@
-from django.core.management.base import BaseCommand
+import time
+from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
-from sports.models import Results
+from authentication.models import Student
+from sports.branches import branch_resolver
+from sports.models import Results, Sport, Team
+from sports.points import points_table
+from sports.signals import standings_changed
+
 
 class Command(BaseCommand):
-    help = 'Updates branch in Results based on player or team'
+    help = 'Recomputes branch and points of Results in bulk (team branch, else registration, else student branch)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sport', type=str, help='Only rectify the sport with this slug')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows read and written per batch (default: 2000)')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing')
 
     def handle(self, *args, **options):
-        results = Results.objects.select_related('player', 'team').all()
-        updated_count = 0
+        started = time.perf_counter()
+        results = Results.objects.all()
+        teams = Team.objects.all()
+        if options['sport']:
+            sport = Sport.objects.filter(slug=options['sport']).first()
+            if sport is None:
+                raise CommandError(f'No sport with slug "{options["sport"]}"')
+            results = results.filter(sport=sport)
+            teams = teams.filter(sport=sport)
 
+        team_branches = dict(teams.values_list('id', 'branch'))
+        table = points_table()
+        chunk_size = options['chunk_size']
+
+        scanned = 0
+        changed_count = 0
+        touched_sports = set()
         with transaction.atomic():
-            for res in results:
-                if res.player:
-                    res.branch = res.player.branch
-                elif res.team:
-                    res.branch = res.team.branch
-                
-                res.save()
-                updated_count += 1
-
-        self.stdout.write(self.style.SUCCESS(f'Successfully updated {updated_count} result records'))
\ No newline at end of file
+            chunk = []
+            rows = results.only('id', 'sport_id', 'team_id', 'player_id', 'branch', 'position', 'points')
+            for result in rows.order_by('pk').iterator(chunk_size=chunk_size):
+                chunk.append(result)
+                if len(chunk) == chunk_size:
+                    changed_count += self.rectify(chunk, team_branches, table, touched_sports, options['dry_run'])
+                    scanned += len(chunk)
+                    chunk = []
+            if chunk:
+                changed_count += self.rectify(chunk, team_branches, table, touched_sports, options['dry_run'])
+                scanned += len(chunk)
+
+            if not options['dry_run']:
+                # bulk_update skips the model signals
+                for sport_id in touched_sports:
+                    standings_changed.send(sender=Results, sport_id=sport_id)
+
+        elapsed = time.perf_counter() - started
+        verb = 'Would update' if options['dry_run'] else 'Successfully updated'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {changed_count} of {scanned} result records in {elapsed:.2f}s'
+        ))
+
+    def rectify(self, chunk, team_branches, table, touched_sports, dry_run):
+        players_by_sport = {}
+        for result in chunk:
+            if result.player_id and not result.team_id:
+                players_by_sport.setdefault(result.sport_id, []).append(result.player_id)
+        registered = {
+            sport_id: branch_resolver.resolve_many(sport_id, player_ids)
+            for sport_id, player_ids in players_by_sport.items()
+        }
+        unregistered = {
+            pid for sport_id, player_ids in players_by_sport.items()
+            for pid in player_ids if pid not in registered[sport_id]
+        }
+        student_branches = dict(
+            Student.objects.filter(pk__in=unregistered).values_list('pk', 'branch')
+        ) if unregistered else {}
+
+        changed = []
+        for result in chunk:
+            if result.team_id:
+                branch = team_branches.get(result.team_id, result.branch)
+            else:
+                branch = registered[result.sport_id].get(result.player_id) \
+                    or student_branches.get(result.player_id, result.branch)
+            points = table.points(result.sport_id, result.position)
+            if (result.branch, result.points) != (branch, points):
+                result.branch, result.points = branch, points
+                changed.append(result)
+                touched_sports.add(result.sport_id)
+
+        if changed and not dry_run:
+            Results.objects.bulk_update(changed, ['branch', 'points'])
+        return len(changed)
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from sports.models import Sport
+from sports.results import sync_results
+
+
+class Command(BaseCommand):
+    help = 'Creates the missing Results rows for every team or registered player'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sport', type=str, help='Only sync the sport with this slug')
+
+    def handle(self, *args, **options):
+        sports = Sport.objects.all()
+        if options['sport']:
+            sports = sports.filter(slug=options['sport'])
+            if not sports.exists():
+                raise CommandError(f'No sport with slug "{options["sport"]}"')
+
+        total = 0
+        for sport in sports:
+            added = sync_results(sport)
+            if added:
+                self.stdout.write(f'{sport.name}: added {added} results')
+            total += added
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully added {total} result records'))
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-17 10:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sports', '0021_merge_20260204_1436'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardVersion',
+            fields=[
+                ('sport', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='leaderboard_version', serialize=False, to='sports.sport')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:40
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def build_standings(apps, schema_editor):
+    Sport = apps.get_model('sports', 'Sport')
+    Results = apps.get_model('sports', 'Results')
+    DepartmentStanding = apps.get_model('sports', 'DepartmentStanding')
+
+    standings = {}
+    for sport in Sport.objects.filter(is_finalized=True):
+        rows = Results.objects.filter(sport=sport).exclude(branch='').values('branch').annotate(total=Sum('points'))
+        for row in rows:
+            standing = standings.setdefault(row['branch'], DepartmentStanding(branch=row['branch'], breakdown={}))
+            standing.breakdown[sport.slug] = row['total'] or 0
+
+    ordered = sorted(standings.values(), key=lambda s: (-sum(s.breakdown.values()), s.branch))
+    for rank, standing in enumerate(ordered, start=1):
+        standing.total_points = sum(standing.breakdown.values())
+        standing.rank = rank
+    DepartmentStanding.objects.bulk_create(ordered)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sports', '0022_leaderboardversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DepartmentStanding',
+            fields=[
+                ('branch', models.CharField(choices=[('COMPS', 'Computer Engineering'), ('IT', 'Information Technology'), ('AIML', 'CSE Artificial Intelligence and Machine Learning'), ('DS', 'CSE Data Science'), ('MECH', 'Mechanical Engineering'), ('CIVIL', 'Civil Engineering')], max_length=6, primary_key=True, serialize=False)),
+                ('total_points', models.IntegerField(default=0)),
+                ('rank', models.PositiveIntegerField(default=0)),
+                ('breakdown', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['rank'],
+            },
+        ),
+        migrations.RunPython(build_standings, migrations.RunPython.noop),
+    ]
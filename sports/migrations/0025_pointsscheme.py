@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-17 13:05
+
+from django.db import migrations, models
+
+
+def seed_schemes(apps, schema_editor):
+    PointsScheme = apps.get_model('sports', 'PointsScheme')
+    # the values update_sport_leaderboard used to hardcode
+    PointsScheme.objects.get_or_create(category='indoor', defaults={'points': [10, 5]})
+    PointsScheme.objects.get_or_create(category='outdoor', defaults={'points': [20, 10]})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sports', '0024_scoreevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PointsScheme',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('indoor', 'Indoor'), ('outdoor', 'Outdoor'), ('TE', 'Third Year (TE)'), ('BE', 'Fourth Year (BE)')], max_length=7, unique=True)),
+                ('points', models.JSONField(default=list, help_text='Points for 1st, 2nd, ... e.g. [10, 5]')),
+            ],
+        ),
+        migrations.RunPython(seed_schemes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-17 12:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sports', '0025_pointsscheme'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Match',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('format', models.CharField(choices=[('knockout', 'Single elimination'), ('round_robin', 'Round robin')], max_length=11)),
+                ('round', models.PositiveSmallIntegerField()),
+                ('slot', models.PositiveIntegerField()),
+                ('home_score', models.PositiveIntegerField(blank=True, null=True)),
+                ('away_score', models.PositiveIntegerField(blank=True, null=True)),
+                ('played', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('away', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='away_matches', to='sports.results')),
+                ('home', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='home_matches', to='sports.results')),
+                ('sport', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='sports.sport')),
+                ('winner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='won_matches', to='sports.results')),
+            ],
+            options={
+                'ordering': ['round', 'slot'],
+                'constraints': [models.UniqueConstraint(fields=('sport', 'round', 'slot'), name='unique_match_slot')],
+            },
+        ),
+    ]
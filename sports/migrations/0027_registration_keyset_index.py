@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-17 12:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sports', '0026_match'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['sport', 'registered_on', 'id'], name='sports_regi_sport_i_851d51_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-17 12:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sports', '0027_registration_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sport',
+            name='max_registrations',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='sport',
+            name='registration_closes',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='sport',
+            name='registration_opens',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 13:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sports', '0028_sport_registration_window'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='results',
+            name='points',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text="Auto-calculated from position using the PointsScheme of the sport's category"),
+        ),
+    ]
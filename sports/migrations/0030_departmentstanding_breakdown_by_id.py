@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-17 16:05
+
+from django.db import migrations
+
+
+def key_by_id(apps, schema_editor):
+    Sport = apps.get_model('sports', 'Sport')
+    DepartmentStanding = apps.get_model('sports', 'DepartmentStanding')
+
+    ids = {slug: str(pk) for pk, slug in Sport.objects.values_list('id', 'slug')}
+    for standing in DepartmentStanding.objects.all():
+        standing.breakdown = {
+            ids[slug]: points for slug, points in standing.breakdown.items() if slug in ids
+        }
+        standing.total_points = sum(standing.breakdown.values())
+        standing.save(update_fields=['breakdown', 'total_points'])
+
+
+def key_by_slug(apps, schema_editor):
+    Sport = apps.get_model('sports', 'Sport')
+    DepartmentStanding = apps.get_model('sports', 'DepartmentStanding')
+
+    slugs = {str(pk): slug for pk, slug in Sport.objects.values_list('id', 'slug')}
+    for standing in DepartmentStanding.objects.all():
+        standing.breakdown = {
+            slugs[key]: points for key, points in standing.breakdown.items() if key in slugs
+        }
+        standing.save(update_fields=['breakdown'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sports', '0029_alter_results_points_help_text'),
+    ]
+
+    operations = [
+        migrations.RunPython(key_by_id, key_by_slug),
+    ]
@@ -1,8 +1,7 @@
 from django.db import models
+from django.db.models import F
 from django.contrib.auth import get_user_model
 from django.utils.text import slugify
-from django.db.models.signals import pre_save
-from django.dispatch import receiver
 from django.core.exceptions import ValidationError
 
 User = get_user_model()
@@ -43,6 +42,10 @@ class Sport(models.Model):
     time = models.CharField(max_length=5, default="")
     img = models.URLField(default="")
     category =  models.CharField(max_length=7, choices=CATEGORY_CHOICES, default='indoor')
+    # registration window and cap, enforced by sports.admission; blank means no limit
+    registration_opens = models.DateTimeField(null=True, blank=True)
+    registration_closes = models.DateTimeField(null=True, blank=True)
+    max_registrations = models.PositiveIntegerField(null=True, blank=True)
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -63,6 +66,8 @@ class Registration(models.Model):
         unique_together = ['student', 'sport']  # Prevent duplicate registrations
         indexes = [
             models.Index(fields=['student', 'sport']),
+            # keyset pages of registration_by_sport
+            models.Index(fields=['sport', 'registered_on', 'id']),
         ]
     def __str__(self):
         return f"{self.student.username} - {self.sport.name}"
@@ -106,7 +111,7 @@ class Results(models.Model):
     position = models.PositiveIntegerField(help_text="1 for 1st, 2 for 2nd, 3 for 3rd")
     score = models.PositiveIntegerField(default=0, help_text="Points earned in the match/game itself")
     points = models.PositiveIntegerField(default=0, editable=False,
-                                         help_text="Auto-calculated: 3 for 1st, 2 for 2nd, 1 for 3rd")
+                                         help_text="Auto-calculated from position using the PointsScheme of the sport's category")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -152,37 +157,113 @@ class Results(models.Model):
         return f"{self.sport.name} - #{self.position} {winner} (Score: {self.score} | Dept Pts: {self.points})"
 
 
-@receiver(pre_save, sender=Results)
-def calculate_leaderboard_data(sender, instance, **kwargs):
-    if instance.position == 1:
-        instance.points = 3
-    elif instance.position == 2:
-        instance.points = 2
-    elif instance.position == 3:
-        instance.points = 1
-    else:
-        instance.points = 0
-
-    if instance.team:
-        instance.branch = instance.team.branch
-    elif instance.player:
-        try:
-            # Note: Ensure Registration is imported/available in this file scope
-            registration = Registration.objects.filter(
-                student=instance.player,
-                sport=instance.sport
-            ).first()
-            if registration:
-                instance.branch = registration.branch
-        except Exception:
-            pass
-        registration = Registration.objects.filter(
-            student=instance.player,
-            sport=instance.sport
-        ).first()
-
-        if registration:
-            instance.branch = registration.branch
+class PointsScheme(models.Model):
+    """Department points per finishing position for one sport category.
+
+    ``points[0]`` is awarded for 1st place, ``points[1]`` for 2nd and so on;
+    positions past the end earn nothing. Compiled by sports.points.
+    """
+    category = models.CharField(max_length=7, choices=CATEGORY_CHOICES, unique=True)
+    points = models.JSONField(default=list, help_text="Points for 1st, 2nd, ... e.g. [10, 5]")
+
+    def __str__(self):
+        return f"{self.category}: {self.points}"
+
+
+class Match(models.Model):
+    """One fixture of a generated bracket (see sports.brackets).
+
+    Entrants are the sport's ``Results`` rows, so a recorded outcome flows
+    straight into positions and points.
+    """
+    KNOCKOUT = 'knockout'
+    ROUND_ROBIN = 'round_robin'
+    FORMAT_CHOICES = [
+        (KNOCKOUT, 'Single elimination'),
+        (ROUND_ROBIN, 'Round robin'),
+    ]
+
+    sport = models.ForeignKey(Sport, on_delete=models.CASCADE, related_name='matches')
+    format = models.CharField(max_length=11, choices=FORMAT_CHOICES)
+    round = models.PositiveSmallIntegerField()
+    slot = models.PositiveIntegerField()
+    home = models.ForeignKey(Results, on_delete=models.CASCADE, null=True, blank=True, related_name='home_matches')
+    away = models.ForeignKey(Results, on_delete=models.CASCADE, null=True, blank=True, related_name='away_matches')
+    winner = models.ForeignKey(Results, on_delete=models.SET_NULL, null=True, blank=True, related_name='won_matches')
+    home_score = models.PositiveIntegerField(null=True, blank=True)
+    away_score = models.PositiveIntegerField(null=True, blank=True)
+    played = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['round', 'slot']
+        constraints = [
+            models.UniqueConstraint(fields=['sport', 'round', 'slot'], name='unique_match_slot'),
+        ]
+
+    def __str__(self):
+        return f"{self.sport_id} R{self.round}#{self.slot}"
+
+
+class ScoreEvent(models.Model):
+    """Append-only log of score deltas applied to a result (see sports.scoring)."""
+    result = models.ForeignKey(Results, on_delete=models.CASCADE, related_name='score_events')
+    delta = models.IntegerField()
+    # set by scorer devices so a retried batch is not applied twice
+    event_id = models.CharField(max_length=64, unique=True, null=True, blank=True)
+    recorded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                                    related_name='score_events')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['result', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.result_id} {self.delta:+d}"
+
+
+class LeaderboardVersion(models.Model):
+    """Per-sport counter bumped on every standings change (see sports.signals).
+
+    Cached leaderboard payloads are keyed by it, so a bump is all it takes to
+    invalidate them in every process.
+    """
+    sport = models.OneToOneField(Sport, on_delete=models.CASCADE, primary_key=True,
+                                 related_name='leaderboard_version')
+    version = models.PositiveBigIntegerField(default=0)
+
+    @classmethod
+    def bump(cls, sport_id):
+        if cls.objects.filter(sport_id=sport_id).update(version=F('version') + 1):
+            return
+        _, created = cls.objects.get_or_create(sport_id=sport_id, defaults={'version': 1})
+        if not created:
+            cls.objects.filter(sport_id=sport_id).update(version=F('version') + 1)
+
+    def __str__(self):
+        return f"{self.sport_id} v{self.version}"
+
+
+class DepartmentStanding(models.Model):
+    """Materialized department leaderboard over finalized sports.
+
+    ``breakdown`` maps sport id to the points the branch earned there; only
+    the changed sport's entry is rewritten (see sports.leaderboards).
+    """
+    branch = models.CharField(max_length=6, choices=BRANCH_CHOICES, primary_key=True)
+    total_points = models.IntegerField(default=0)
+    rank = models.PositiveIntegerField(default=0)
+    breakdown = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['rank']
+
+    def __str__(self):
+        return f"#{self.rank} {self.branch} ({self.total_points})"
+
 
 class TeamRequest(models.Model):
     student = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -0,0 +1,84 @@
+"""Keyset pagination for the long sports lists.
+
+Opt-in: a list is paginated only when the request carries ``page_size`` or
+``cursor``; otherwise the view returns the whole list as before. Pages are
+ordered by ``ordering`` (the last field must be unique) and the cursor holds
+the last row's values, so each page is one indexed range scan whatever its
+depth, unlike ``OFFSET``.
+"""
+import base64
+import json
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination:
+    page_size = 100
+    max_page_size = 500
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, *ordering):
+        self.ordering = ordering
+        self.next_cursor = None
+        self.request = None
+
+    def paginate_queryset(self, queryset, request):
+        """The rows of the requested page, or ``None`` when pagination was not asked for."""
+        params = request.query_params
+        if 'page_size' not in params and 'cursor' not in params:
+            return None
+        self.request = request
+        page_size = self.get_page_size(params.get('page_size'))
+
+        queryset = queryset.order_by(*self.ordering)
+        if params.get('cursor'):
+            queryset = queryset.filter(self.after(self.decode(params['cursor'])))
+        rows = list(queryset[:page_size + 1])
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            self.next_cursor = self.encode([getattr(rows[-1], field) for field in self.ordering])
+        return rows
+
+    def get_page_size(self, value):
+        try:
+            size = int(value)
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def after(self, values, index=0):
+        """``(a, b, c) > (va, vb, vc)`` spelled out as ``a > va OR (a = va AND (b, c) > ...)``."""
+        field = self.ordering[index]
+        greater = Q(**{f'{field}__gt': values[index]})
+        if index == len(self.ordering) - 1:
+            return greater
+        return greater | (Q(**{field: values[index]}) & self.after(values, index + 1))
+
+    def encode(self, values):
+        values = [v.isoformat() if hasattr(v, 'isoformat') else v for v in values]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode(self, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            if not all(v is None or isinstance(v, (str, int, float)) for v in values):
+                raise ValueError
+            return [parse_datetime(v) or v if isinstance(v, str) else v for v in values]
+        except (ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), 'cursor', self.next_cursor)
+
+    def get_paginated_response(self, payload):
+        """Wrap a list (or a side-loaded ``{"results": ..., ...}`` payload) with the next link."""
+        if isinstance(payload, dict):
+            return Response({'next': self.get_next_link(), **payload})
+        return Response({'next': self.get_next_link(), 'results': payload})
@@ -0,0 +1,77 @@
+"""Department points engine.
+
+``PointsScheme`` rows are compiled into one lookup table, ``sport_id ->
+(points for 1st, 2nd, ...)``, kept in the cache and rebuilt after any scheme
+or sport change. Every path that sets ``Results.points`` goes through it, so
+one sport's points can be recomputed in a single pass over its results.
+
+Without a shared cache (``CACHE_IS_SHARED``) a scheme edit would only reach
+the worker that made it, so the table is then rebuilt on every call.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from .caching import cache_is_shared
+from .models import PointsScheme, Results, Sport
+
+KEY = 'sports:points_table'
+
+
+class PointsTable:
+
+    def __init__(self, schemes, sport_categories):
+        self.schemes = schemes
+        self.sport_categories = sport_categories
+
+    def row_for(self, sport_id):
+        category = self.sport_categories.get(sport_id)
+        if category is None:
+            # a sport created after the table was built
+            category = Sport.objects.filter(pk=sport_id).values_list('category', flat=True).first()
+        return self.schemes.get(category, ())
+
+    def points(self, sport_id, position):
+        row = self.row_for(sport_id)
+        if position and 0 < position <= len(row):
+            return row[position - 1]
+        return 0
+
+
+def _build():
+    return PointsTable(
+        {category: tuple(points) for category, points in PointsScheme.objects.values_list('category', 'points')},
+        dict(Sport.objects.values_list('id', 'category')),
+    )
+
+
+def points_table():
+    if not cache_is_shared():
+        return _build()
+    table = cache.get(KEY)
+    if table is None:
+        table = _build()
+        cache.set(KEY, table, getattr(settings, 'SPORTS_POINTS_CACHE_TTL', 5 * 60))
+    return table
+
+
+def invalidate():
+    cache.delete(KEY)
+
+
+def assign_points(results):
+    """Set ``points`` from ``position`` on each result; returns the ones that changed."""
+    table = points_table()
+    changed = []
+    for result in results:
+        points = table.points(result.sport_id, result.position)
+        if result.points != points:
+            result.points = points
+            changed.append(result)
+    return changed
+
+
+def recompute_sport_points(sport):
+    """Recompute every result of ``sport`` with one read and one bulk_update."""
+    results = list(Results.objects.filter(sport=sport).only('id', 'sport_id', 'position', 'points'))
+    changed = assign_points(results)
+    Results.objects.bulk_update(changed, ['points'])
+    return changed
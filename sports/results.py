@@ -0,0 +1,97 @@
+"""Keeps a ``Results`` row for every entrant of a sport.
+
+Team sports get one row per ``Team``, individual sports one row per
+``Registration``. Rows are added when the entrant is created, so reading a
+leaderboard never has to write. ``sync_results`` fills in whatever is missing
+(e.g. entrants created before this existed) in one bulk insert per sport.
+
+New rows go to the bottom of the table. The sport's row is locked while the
+next position is read, so concurrent registrations get distinct positions.
+"""
+from django.db import transaction
+from django.db.models import Max
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .models import LeaderboardVersion, Registration, Results, Sport, Team
+from .points import points_table
+from .signals import standings_changed
+from .snapshots import schedule_publish
+
+
+def _lock_sport(sport):
+    Sport.objects.select_for_update().filter(pk=sport.pk).values_list('pk').first()
+
+
+def _next_position(sport):
+    """The position after the last one; call with the sport locked (``_lock_sport``)."""
+    last = Results.objects.filter(sport=sport).aggregate(last=Max('position'))['last']
+    return (last or 0) + 1
+
+
+def _entrants_added(sport, results):
+    if any(result.points for result in results):
+        standings_changed.send(sender=Results, sport_id=sport.pk)
+        return
+    # no points moved, so department standings are untouched; only the
+    # sport's own table grew
+    LeaderboardVersion.bump(sport.pk)
+    schedule_publish(sport.pk)
+
+
+def missing_results(sport):
+    """Unsaved ``Results`` for entrants of ``sport`` that have none yet."""
+    if sport.isTeamBased:
+        entrants = Team.objects.filter(sport=sport).exclude(
+            result_team__sport=sport
+        ).order_by('id').values_list('id', 'branch')
+        field = 'team_id'
+    else:
+        entrants = Registration.objects.filter(sport=sport).exclude(
+            student__result_player__sport=sport
+        ).order_by('id').values_list('student_id', 'branch')
+        field = 'player_id'
+
+    position = _next_position(sport)
+    table = points_table()
+    missing = []
+    for entrant_id, branch in entrants:
+        missing.append(Results(
+            sport=sport, branch=branch, position=position, points=table.points(sport.pk, position),
+            **{field: entrant_id}
+        ))
+        position += 1
+    return missing
+
+
+def sync_results(sport):
+    """Create the missing ``Results`` rows for ``sport``. Returns how many were added."""
+    with transaction.atomic():
+        _lock_sport(sport)
+        missing = missing_results(sport)
+        # the unique constraints make a concurrent insert of the same entrant a no-op
+        Results.objects.bulk_create(missing, ignore_conflicts=True)
+        if missing:
+            _entrants_added(sport, missing)
+    return len(missing)
+
+
+def _add_result(sport, **entrant):
+    with transaction.atomic():
+        _lock_sport(sport)
+        position = _next_position(sport)
+        # bulk_create skips pre_save, so set what calculate_leaderboard_data would
+        result = Results(sport=sport, position=position, points=points_table().points(sport.pk, position), **entrant)
+        Results.objects.bulk_create([result], ignore_conflicts=True)
+        _entrants_added(sport, [result])
+
+
+@receiver(post_save, sender=Team)
+def add_team_result(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and instance.sport.isTeamBased:
+        _add_result(instance.sport, team=instance, branch=instance.branch)
+
+
+@receiver(post_save, sender=Registration)
+def add_player_result(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and not instance.sport.isTeamBased:
+        _add_result(instance.sport, player_id=instance.student_id, branch=instance.branch)
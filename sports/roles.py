@@ -0,0 +1,55 @@
+"""Coordinator lookup for permission checks.
+
+A user coordinates a sport when they are one of its ``primary`` or
+``secondary`` coordinators. The resolver keeps each user's coordinated sport
+ids in the cache, built with one query and dropped whenever either M2M of a
+sport they are (or were) on changes, so a permission check is a set lookup.
+
+That only holds with a cache every worker shares (``CACHE_IS_SHARED``): with
+the per-process fallback a revoked coordinator would keep access in other
+workers, so the ids are then read from the database on every check.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from .caching import cache_is_shared
+from .models import Sport
+
+KEY = 'sports:coordinated:{}'
+
+
+class RoleResolver:
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'SPORTS_ROLE_CACHE_TTL', 10 * 60)
+
+    def coordinated_sport_ids(self, user):
+        """Ids of the sports ``user`` coordinates, as a frozenset."""
+        if not user.is_authenticated:
+            return frozenset()
+        if not cache_is_shared():
+            return self._load(user)
+        sport_ids = cache.get(KEY.format(user.pk))
+        if sport_ids is None:
+            sport_ids = self._load(user)
+            cache.set(KEY.format(user.pk), sport_ids, self.ttl)
+        return sport_ids
+
+    def _load(self, user):
+        return frozenset(Sport.objects.filter(
+            Q(primary=user) | Q(secondary=user)
+        ).values_list('id', flat=True))
+
+    def is_coordinator(self, user, sport_id):
+        return sport_id in self.coordinated_sport_ids(user)
+
+    def can_manage(self, user, sport_id):
+        """Coordinators of the sport, staff and superusers."""
+        return user.is_staff or user.is_superuser or self.is_coordinator(user, sport_id)
+
+    def invalidate(self, user_ids):
+        cache.delete_many([KEY.format(pk) for pk in user_ids])
+
+
+role_resolver = RoleResolver()
@@ -0,0 +1,7 @@
+from django.urls import path
+from .consumers import LeaderboardConsumer
+
+websocket_urlpatterns = [
+    path('ws/leaderboard/department/', LeaderboardConsumer.as_asgi()),
+    path('ws/leaderboard/sport/<slug:sport_slug>/', LeaderboardConsumer.as_asgi()),
+]
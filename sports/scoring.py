@@ -0,0 +1,87 @@
+"""Batched score updates.
+
+Scorers send score deltas, possibly several per request. Each batch is logged
+as ``ScoreEvent`` rows and then applied with one ``UPDATE`` per result using
+``F()`` expressions, so concurrent taps never overwrite each other and no
+``Results.save()`` (``full_clean`` plus the pre_save receiver) runs.
+Scores are clamped to ``0..MAX_SCORE`` in the same statement.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+from .leaderboards import publish_results
+from .models import Results, ScoreEvent
+from .signals import standings_changed
+
+MAX_SCORE = 9999
+
+
+class ScoreEventError(Exception):
+
+    def __init__(self, detail):
+        super().__init__(detail)
+        self.detail = detail
+
+
+def _adjusted_score(delta):
+    # add/subtract a positive amount only: the column is unsigned on MySQL
+    if delta > 0:
+        return Case(When(score__gte=MAX_SCORE - delta, then=Value(MAX_SCORE)), default=F('score') + delta)
+    return Case(When(score__lte=-delta, then=Value(0)), default=F('score') - (-delta))
+
+
+def apply_score_events(events, user=None):
+    """Log and apply ``events`` (dicts with ``result_id``, ``delta``, optional ``event_id``).
+
+    All-or-nothing: raises ``ScoreEventError`` if a result is missing or its
+    sport is finalized. Events whose ``event_id`` was already recorded are
+    skipped. Returns ``(results, duplicates)`` with the updated results.
+    """
+    result_ids = {e['result_id'] for e in events}
+    results = {r.id: r for r in Results.objects.select_related('sport').filter(id__in=result_ids)}
+    missing = result_ids - set(results)
+    if missing:
+        raise ScoreEventError(f"Result not found: {sorted(missing)}")
+    finalized = sorted(rid for rid, r in results.items() if r.sport.is_finalized)
+    if finalized:
+        raise ScoreEventError(f"Cannot adjust score. Sport standings are finalized for results {finalized}.")
+
+    event_ids = [e['event_id'] for e in events if e.get('event_id')]
+    seen = set(ScoreEvent.objects.filter(event_id__in=event_ids).values_list('event_id', flat=True))
+    fresh = []
+    for event in events:
+        event_id = event.get('event_id') or None
+        if event_id in seen:
+            continue
+        if event_id:
+            seen.add(event_id)
+        fresh.append(ScoreEvent(result_id=event['result_id'], delta=event['delta'],
+                                event_id=event_id, recorded_by=user))
+    duplicates = len(events) - len(fresh)
+
+    totals = {}
+    for event in fresh:
+        totals[event.result_id] = totals.get(event.result_id, 0) + event.delta
+
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            ScoreEvent.objects.bulk_create(fresh)
+            for result_id, delta in totals.items():
+                if delta:
+                    Results.objects.filter(pk=result_id).update(score=_adjusted_score(delta), updated_at=now)
+
+            scores = dict(Results.objects.filter(pk__in=totals).values_list('id', 'score'))
+            changed = {}
+            for result_id, score in scores.items():
+                result = results[result_id]
+                result.score = score
+                changed.setdefault(result.sport, []).append(result)
+            for sport, sport_results in changed.items():
+                standings_changed.send(sender=ScoreEvent, sport_id=sport.pk)
+                publish_results(sport, sport_results)
+    except IntegrityError:
+        # a concurrent retry recorded the same event_id first
+        raise ScoreEventError("Duplicate event_id in a concurrent request; retry the batch.")
+
+    return [results[rid] for rid in sorted(result_ids)], duplicates
@@ -1,18 +1,50 @@
 from rest_framework import serializers
-from .models import Sport, Registration, Team, Results, TeamRequest
+from .models import Sport, Registration, Team, Results, TeamRequest, Match
 from django.contrib.auth import get_user_model
 from django.db import transaction
+from django.db.models import Count
 
 User = get_user_model()
 
 
+def sport_queryset():
+    """Sports with everything ``SportSerializer`` reads, in three queries for any number of rows."""
+    return Sport.objects.annotate(
+        participants_count=Count('registration', distinct=True)
+    ).prefetch_related('primary', 'secondary')
+
+
+def query_param(context, name):
+    request = context.get('request')
+    if request is None or request.method != 'GET':
+        return None
+    return request.query_params.get(name)
+
+
+def is_compact(context):
+    """``?compact=1``: nested sports are rendered as their slug."""
+    return query_param(context, 'compact') in ('1', 'true')
+
+
+class SparseFieldsMixin:
+    """Keep only the fields listed in ``?fields=a,b`` on GET requests."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = query_param(self.context, 'fields')
+        if requested:
+            allowed = {name.strip() for name in requested.split(',')}
+            for name in set(self.fields) - allowed:
+                self.fields.pop(name)
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['moodleID', 'username', 'email', 'first_name', 'last_name']
 
 
-class SportSerializer(serializers.ModelSerializer):
+class SportSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     primary = UserSerializer(many=True, read_only=True)
     secondary = UserSerializer(many=True, read_only=True)
     participants_count = serializers.SerializerMethodField()
@@ -22,17 +54,82 @@ class SportSerializer(serializers.ModelSerializer):
         fields = ['slug','id', 'name', 'description', 'isTeamBased', 'primary', 'teamSize','secondary', 'participants_count']
 
     def get_participants_count(self, obj):
+        if hasattr(obj, 'participants_count'):
+            return obj.participants_count
         return obj.registration_set.count()
 
 
-class RegistrationSerializer(serializers.ModelSerializer):
+class SportSummarySerializer(serializers.ModelSerializer):
+    """What list pages need of a sport; side-loaded in compact responses."""
+    class Meta:
+        model = Sport
+        fields = ['id', 'slug', 'name', 'isTeamBased', 'teamSize']
+
+
+class CachedSportField(serializers.Field):
+    """Nested ``SportSerializer`` output, built once per sport per response.
+
+    Serialized sports are kept in the root serializer's context under
+    ``sport_cache``; ``SportPreloadListSerializer`` fills it for a whole page
+    with ``sport_queryset()`` before any row is rendered. In compact mode the
+    field is just the slug and summaries are collected for side-loading.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = 'sport_id'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, sport_id):
+        sports = preload_sports(self.context, [sport_id])
+        sport = sports.get(sport_id)
+        if sport is not None and is_compact(self.context):
+            return sport['slug']
+        return sport
+
+
+def preload_sports(context, sport_ids):
+    compact = is_compact(context)
+    sports = context.setdefault('sport_cache', {})
+    missing = set(sport_ids) - set(sports)
+    if missing:
+        if compact:
+            rendered = SportSummarySerializer(Sport.objects.filter(id__in=missing), many=True).data
+        else:
+            rendered = SportSerializer(sport_queryset().filter(id__in=missing), many=True).data
+        sports.update((sport['id'], sport) for sport in rendered)
+    return sports
+
+
+def list_payload(serializer):
+    """``serializer.data``, or ``{"results": ..., "sports": {slug: summary}}`` with ``?compact=1&include=sports``."""
+    data = serializer.data
+    context = serializer.context
+    if not (is_compact(context) and query_param(context, 'include') == 'sports'):
+        return data
+    sports = context.get('sport_cache', {}).values()
+    return {'results': data, 'sports': {sport['slug']: sport for sport in sports}}
+
+
+class SportPreloadListSerializer(serializers.ListSerializer):
+
+    def to_representation(self, data):
+        if hasattr(data, 'all'):
+            data = list(data.all())
+        if 'sport' in self.child.fields:
+            preload_sports(self.context, {item.sport_id for item in data})
+        return super().to_representation(data)
+
+
+class RegistrationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     student = UserSerializer(read_only=True)
-    sport = SportSerializer(read_only=True)
+    sport = CachedSportField()
     sport_slug = serializers.SlugField(write_only=True)
     branch = serializers.CharField(read_only=True)
     year = serializers.CharField(read_only=True)
     class Meta:
         model = Registration
+        list_serializer_class = SportPreloadListSerializer
         fields = [
             'id', 'student', 'sport', 'sport_slug',
             'year', 'branch', 'registered_on', 'registration_modified'
@@ -42,24 +139,25 @@ class RegistrationSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         sport_slug = validated_data.pop('sport_slug')
         user = self.context['request'].user
-        try:
-            sport = Sport.objects.get(slug=sport_slug)
-        except Sport.DoesNotExist:
-            raise serializers.ValidationError({"sport_slug": "Invalid sport slug"})
+        if 'sport_id' not in validated_data:
+            # the registration view resolves the sport from the cached windows
+            try:
+                validated_data['sport'] = Sport.objects.get(slug=sport_slug)
+            except Sport.DoesNotExist:
+                raise serializers.ValidationError({"sport_slug": "Invalid sport slug"})
 
         registration = Registration.objects.create(
             student=user,
             branch=user.branch,
             year=user.year,
-            sport=sport,
             **validated_data
         )
         return registration
 
 
-class TeamSerializer(serializers.ModelSerializer):
+class TeamSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     members = UserSerializer(many=True, read_only=True)
-    sport = SportSerializer(read_only=True)
+    sport = CachedSportField()
     sport_id = serializers.IntegerField(write_only=True)
     member_ids = serializers.ListField(
         child=serializers.IntegerField(),
@@ -73,6 +171,7 @@ class TeamSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Team
+        list_serializer_class = SportPreloadListSerializer
         fields = [
             'id', 'name', 'branch', 'sport', 'sport_id',
             'members', 'member_ids', 'manager', 'manager_id',
@@ -252,6 +351,51 @@ class ResultScoreAdjustSerializer(serializers.Serializer):
         return value
 
 
+class ScoreEventSerializer(serializers.Serializer):
+    """One score delta in a batch sent to the score-events endpoint"""
+    result_id = serializers.IntegerField()
+    delta = serializers.IntegerField(min_value=-100, max_value=100)
+    event_id = serializers.CharField(max_length=64, required=False, allow_blank=True)
+
+    def validate_delta(self, value):
+        if value == 0:
+            raise serializers.ValidationError("Delta cannot be zero")
+        return value
+
+
+class MatchSerializer(serializers.ModelSerializer):
+    """Serializer for bracket fixtures"""
+    home_name = serializers.SerializerMethodField()
+    away_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Match
+        fields = [
+            'id', 'format', 'round', 'slot', 'home', 'home_name', 'away', 'away_name',
+            'winner', 'home_score', 'away_score', 'played', 'updated_at'
+        ]
+
+    def _entrant_name(self, result):
+        if result is None:
+            return None
+        if result.team_id:
+            return result.team.name
+        return result.player.username if result.player_id else None
+
+    def get_home_name(self, obj):
+        return self._entrant_name(obj.home)
+
+    def get_away_name(self, obj):
+        return self._entrant_name(obj.away)
+
+
+class MatchOutcomeSerializer(serializers.Serializer):
+    """Outcome of a match; omit winner for a round-robin draw"""
+    winner = serializers.IntegerField(required=False, allow_null=True)
+    home_score = serializers.IntegerField(required=False, allow_null=True, min_value=0)
+    away_score = serializers.IntegerField(required=False, allow_null=True, min_value=0)
+
+
 class DepartmentLeaderboardSerializer(serializers.Serializer):
     """Serializer for department-level leaderboard aggregation"""
     branch = serializers.CharField()
@@ -0,0 +1,125 @@
+"""Standings change notifications.
+
+Every write that can change what a leaderboard shows sends
+``standings_changed(sport_id=...)``. The receivers here bump the sport's
+``LeaderboardVersion`` so cached payloads keyed by the old version stop being
+served, refresh the sport's share of ``DepartmentStanding`` and re-export
+the static snapshots (sports.snapshots). Views that
+use bulk updates send it themselves; saves of a sport (finalizing included)
+and admin edits of single results and teams are picked up from the model
+signals below.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import Signal, receiver
+from .admission import registration_gate
+from .branches import branch_resolver
+from .roles import role_resolver
+from .leaderboards import apply_contribution, refresh_department_standings
+from .snapshots import schedule_publish
+from .models import LeaderboardVersion, PointsScheme, Registration, Results, Sport, Team
+from . import points
+
+standings_changed = Signal()
+
+
+@receiver(standings_changed)
+def bump_leaderboard_version(sender, sport_id, **kwargs):
+    LeaderboardVersion.bump(sport_id)
+
+
+@receiver(standings_changed)
+def update_department_standings(sender, sport_id, **kwargs):
+    # counts finalize/unfinalize and edits made while finalized
+    refresh_department_standings(sport_id)
+
+
+@receiver(standings_changed)
+def export_snapshot(sender, sport_id, **kwargs):
+    schedule_publish(sport_id)
+
+
+@receiver(post_delete, sender=Sport)
+def drop_department_contribution(sender, instance, **kwargs):
+    apply_contribution(instance.pk, {})
+
+
+@receiver(post_save, sender=Sport)
+def sport_saved(sender, instance, created=False, raw=False, **kwargs):
+    # finalizing from the API or the admin, and slug renames the snapshots follow
+    if not raw and not created:
+        standings_changed.send(sender=sender, sport_id=instance.pk)
+
+
+@receiver(post_save, sender=Results)
+@receiver(post_save, sender=Team)
+def entrant_saved(sender, instance, created=False, raw=False, **kwargs):
+    # a new team's standing arrives with its Results row (sports.results)
+    if not raw and not (sender is Team and created):
+        standings_changed.send(sender=sender, sport_id=instance.sport_id)
+
+
+@receiver(post_delete, sender=Results)
+@receiver(post_delete, sender=Team)
+def entrant_deleted(sender, instance, origin=None, **kwargs):
+    # deleting the sport itself takes its version row with it
+    if not isinstance(origin, Sport):
+        standings_changed.send(sender=sender, sport_id=instance.sport_id)
+
+
+@receiver(pre_save, sender=Results)
+def calculate_leaderboard_data(sender, instance, **kwargs):
+    instance.points = points.points_table().points(instance.sport_id, instance.position)
+
+    if instance.team_id:
+        instance.branch = instance.team.branch
+    elif instance.player_id:
+        branch = branch_resolver.resolve(instance.sport_id, instance.player_id)
+        if branch:
+            instance.branch = branch
+
+
+@receiver(post_save, sender=Registration)
+@receiver(post_delete, sender=Registration)
+def registration_changed(sender, instance, **kwargs):
+    branch_resolver.invalidate(instance.sport_id)
+
+
+@receiver(post_delete, sender=Registration)
+def registration_removed(sender, instance, **kwargs):
+    registration_gate.forget_count(instance.sport_id)
+
+
+@receiver(post_save, sender=Sport)
+@receiver(post_delete, sender=Sport)
+def registration_window_changed(sender, **kwargs):
+    registration_gate.invalidate()
+
+
+@receiver(m2m_changed, sender=Sport.primary.through)
+@receiver(m2m_changed, sender=Sport.secondary.through)
+def coordinators_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if reverse:
+        # user.primary_sports.add(...) and friends
+        role_resolver.invalidate([instance.pk])
+    elif action == 'pre_clear':
+        field = 'primary' if sender is Sport.primary.through else 'secondary'
+        role_resolver.invalidate(getattr(instance, field).values_list('pk', flat=True))
+    else:
+        role_resolver.invalidate(pk_set)
+
+
+@receiver(pre_delete, sender=Sport)
+def drop_coordinator_roles(sender, instance, **kwargs):
+    user_ids = set(instance.primary.values_list('pk', flat=True))
+    user_ids.update(instance.secondary.values_list('pk', flat=True))
+    role_resolver.invalidate(user_ids)
+
+
+@receiver(post_save, sender=PointsScheme)
+@receiver(post_delete, sender=PointsScheme)
+@receiver(post_save, sender=Sport)
+@receiver(post_delete, sender=Sport)
+def points_inputs_changed(sender, **kwargs):
+    points.invalidate()
@@ -0,0 +1,184 @@
+"""Static leaderboard snapshots for the public site.
+
+When ``LEADERBOARD_SNAPSHOT_ROOT`` is set, every standings change rewrites the
+sport's leaderboard and the department leaderboard as JSON files under it:
+
+    sport/<slug>.<hash>.json
+    department.<hash>.json
+    manifest.json            -> {"sports": {slug: path}, "department": path, ...}
+
+Blob names carry a hash of their content, so they can be cached forever by a
+CDN or static host; only ``manifest.json`` has to be revalidated. The body of
+each blob is exactly what the REST endpoint returns.
+
+Writes happen on a background thread, ``LEADERBOARD_SNAPSHOT_DELAY`` seconds
+after the first change, so a burst of score taps costs one export per sport
+and none of it runs in the request. Each manifest entry records when its data
+was read; a slower publish never replaces an entry read after its own.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from .leaderboards import department_standings, sport_standings
+from .models import Sport
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not on Windows
+    fcntl = None
+
+MANIFEST = 'manifest.json'
+# older blobs are kept briefly for clients that read the previous manifest
+KEEP_VERSIONS = 3
+
+
+def snapshot_root():
+    return getattr(settings, 'LEADERBOARD_SNAPSHOT_ROOT', None)
+
+
+def _write_atomic(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(content)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+
+
+def _write_blob(root, directory, name, data):
+    content = JSONRenderer().render(data)
+    digest = hashlib.sha256(content).hexdigest()[:16]
+    relative = os.path.join(directory, f'{name}.{digest}.json') if directory else f'{name}.{digest}.json'
+    path = os.path.join(root, relative)
+    if not os.path.exists(path):
+        _write_atomic(path, content)
+        _prune(os.path.dirname(path), name)
+    return relative.replace(os.sep, '/')
+
+
+def _prune(directory, name):
+    blobs = [
+        os.path.join(directory, f) for f in os.listdir(directory)
+        if f.startswith(f'{name}.') and f.endswith('.json') and f.count('.') == 2
+    ]
+    blobs.sort(key=os.path.getmtime, reverse=True)
+    for stale in blobs[KEEP_VERSIONS:]:
+        try:
+            os.remove(stale)
+        except OSError:
+            pass
+
+
+@contextmanager
+def _manifest_lock(root):
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, '.manifest.lock'), 'w') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def _update_manifest(root, sports, department, read_at):
+    with _manifest_lock(root):
+        path = os.path.join(root, MANIFEST)
+        try:
+            with open(path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {'sports': {}}
+        read = manifest.setdefault('read_at', {'sports': {}, 'department': 0})
+        for slug, blob in sports.items():
+            if read['sports'].get(slug, 0) <= read_at:
+                manifest.setdefault('sports', {})[slug] = blob
+                read['sports'][slug] = read_at
+        if read.get('department', 0) <= read_at:
+            manifest['department'] = department
+            read['department'] = read_at
+        manifest['generated_at'] = timezone.now().isoformat()
+        _write_atomic(path, json.dumps(manifest, indent=2).encode())
+
+
+def _department_data():
+    if not Sport.objects.filter(is_finalized=True).exists():
+        return {"message": "No sports have been finalized yet.", "leaderboard": []}
+    return department_standings()
+
+
+def publish(sport_ids=None):
+    """Write snapshots of ``sport_ids`` (all sports when None) and of the department table.
+
+    Returns how many sport snapshots were written.
+    """
+    root = snapshot_root()
+    if not root:
+        return 0
+    read_at = time.time()
+    sports = Sport.objects.all() if sport_ids is None else Sport.objects.filter(pk__in=sport_ids)
+    paths = {sport.slug: _write_blob(root, 'sport', sport.slug, sport_standings(sport)) for sport in sports}
+    department_path = _write_blob(root, '', 'department', _department_data())
+    _update_manifest(root, paths, department_path, read_at)
+    return len(paths)
+
+
+def publish_all():
+    """Write snapshots for every sport; returns how many were written."""
+    return publish()
+
+
+class SnapshotPublisher:
+    """Collects changed sports and publishes them together off the request thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._timer = None
+
+    @property
+    def delay(self):
+        return getattr(settings, 'LEADERBOARD_SNAPSHOT_DELAY', 1.0)
+
+    def schedule(self, sport_id):
+        with self._lock:
+            self._pending.add(sport_id)
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(self.delay, self._run)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            sport_ids, self._pending = self._pending, set()
+            self._timer = None
+        if not sport_ids:
+            return
+        try:
+            publish(sport_ids)
+        except (OSError, DatabaseError):
+            # the API stays authoritative; the next change rewrites the snapshot
+            pass
+
+    def _run(self):
+        try:
+            self.flush()
+        finally:
+            # the timer thread opened its own connections
+            connections.close_all()
+
+
+snapshot_publisher = SnapshotPublisher()
+
+
+def schedule_publish(sport_id):
+    """Publish once the current transaction commits (no-op when snapshots are off)."""
+    if not snapshot_root():
+        return
+    transaction.on_commit(lambda: snapshot_publisher.schedule(sport_id))
@@ -1,3 +1,632 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from datetime import timedelta
+from django.test import Client, TestCase, override_settings
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from .branches import branch_resolver
+from .roles import role_resolver
+from .signals import calculate_leaderboard_data
+from .leaderboards import sport_group
+from .brackets import round_robin_positions
+from .models import Sport, Registration, Team, Results, DepartmentStanding, ScoreEvent, PointsScheme, Match
+from .pagination import KeysetPagination
+from .points import recompute_sport_points
+from .snapshots import publish, snapshot_publisher
+from .serializers import RegistrationSerializer, SportSerializer, sport_queryset
 
-# Create your tests here.
+User = get_user_model()
+
+
+class ResultsSyncTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.chess = Sport.objects.create(name='Chess', category='indoor')
+        self.football = Sport.objects.create(name='Football', isTeamBased=True, category='outdoor')
+        self.alice = User.objects.create_user(moodleID=1001, password='pass1234')
+        self.bob = User.objects.create_user(moodleID=1002, password='pass1234')
+
+    def test_new_entrants_get_results(self):
+        Registration.objects.create(student=self.alice, sport=self.chess, branch='IT')
+        Registration.objects.create(student=self.bob, sport=self.chess, branch='COMPS')
+        # registering for a team sport is not an entry by itself
+        Registration.objects.create(student=self.alice, sport=self.football, branch='IT')
+        team = Team.objects.create(name='Strikers', branch='IT', sport=self.football)
+
+        chess = Results.objects.filter(sport=self.chess).order_by('position')
+        self.assertEqual([(r.player_id, r.branch, r.position) for r in chess],
+                         [(1001, 'IT', 1), (1002, 'COMPS', 2)])
+        self.assertEqual(list(Results.objects.filter(sport=self.football).values_list('team_id', flat=True)),
+                         [team.id])
+
+    def test_leaderboard_get_does_not_write(self):
+        Registration.objects.create(student=self.alice, sport=self.chess, branch='IT')
+        url = reverse('sports:sport-leaderboard', args=['chess'])
+        with self.assertNumQueries(2):
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([(row['position'], row['branch']) for row in resp.json()], [(1, 'IT')])
+
+    def test_sync_results_backfills_missing_rows(self):
+        Registration.objects.create(student=self.alice, sport=self.chess, branch='IT')
+        Registration.objects.create(student=self.bob, sport=self.chess, branch='IT')
+        Results.objects.filter(player=self.bob).delete()
+
+        call_command('sync_results', stdout=StringIO())
+        call_command('sync_results', stdout=StringIO())
+
+        self.assertEqual(Results.objects.filter(sport=self.chess).count(), 2)
+        self.assertEqual(Results.objects.get(player=self.bob).position, 2)
+
+    def test_positions_follow_the_last_row_and_only_points_signal(self):
+        carol = User.objects.create_user(moodleID=1003, password='pass1234')
+        Registration.objects.create(student=self.alice, sport=self.chess, branch='IT')
+        Registration.objects.create(student=self.bob, sport=self.chess, branch='IT')
+        Results.objects.filter(player=self.alice).delete()
+
+        with mock.patch('sports.signals.refresh_department_standings') as refresh:
+            # indoor pays 1st and 2nd only: the third entrant earns nothing
+            Registration.objects.create(student=carol, sport=self.chess, branch='IT')
+        self.assertEqual(Results.objects.get(player=carol).position, 3)
+        refresh.assert_not_called()
+
+
+class SerializationQueryTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(moodleID=9001, password='pass1234', is_staff=True)
+        self.chess = Sport.objects.create(name='Chess', category='indoor')
+        self.carrom = Sport.objects.create(name='Carrom', category='indoor')
+        self.chess.primary.add(self.admin)
+        self.carrom.secondary.add(self.admin)
+        self.next_id = 1000
+
+    def register(self, count, sport):
+        for _ in range(count):
+            self.next_id += 1
+            student = User.objects.create_user(moodleID=self.next_id, password='pass1234')
+            Registration.objects.create(student=student, sport=sport, branch='IT')
+
+    def test_registration_list_serializes_each_sport_once(self):
+        self.register(3, self.chess)
+        self.register(2, self.carrom)
+        registrations = Registration.objects.select_related('student').order_by('id')
+        # registrations, sports, primary, secondary
+        with self.assertNumQueries(4):
+            data = RegistrationSerializer(registrations, many=True).data
+        self.assertEqual([row['sport']['participants_count'] for row in data], [3, 3, 3, 2, 2])
+        self.assertEqual(data[0]['sport']['primary'][0]['moodleID'], 9001)
+
+        with self.assertNumQueries(3):
+            sports = SportSerializer(sport_queryset().order_by('id'), many=True).data
+        self.assertEqual([s['participants_count'] for s in sports], [3, 2])
+
+    def test_registration_by_sport_query_count_is_flat(self):
+        self.register(2, self.chess)
+        self.client.force_login(self.admin)
+        url = reverse('sports:registration-by-sport', args=['chess'])
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url)
+
+        self.register(20, self.chess)
+        with self.assertNumQueries(len(small)):
+            resp = self.client.get(url)
+        self.assertEqual(len(resp.json()), 22)
+
+    def test_sparse_and_compact_registration_lists(self):
+        self.register(2, self.chess)
+        self.register(1, self.carrom)
+        self.client.force_login(self.admin)
+        url = reverse('sports:registration-list')
+
+        rows = self.client.get(url, {'fields': 'id,sport'}).json()
+        self.assertEqual(set(rows[0]), {'id', 'sport'})
+        self.assertIn('primary', rows[0]['sport'])
+
+        resp = self.client.get(url, {'compact': '1', 'include': 'sports', 'fields': 'id,sport'}).json()
+        self.assertEqual(sorted(row['sport'] for row in resp['results']), ['carrom', 'chess', 'chess'])
+        self.assertEqual(resp['sports']['chess'], {
+            'id': self.chess.id, 'slug': 'chess', 'name': 'Chess', 'isTeamBased': False, 'teamSize': 0
+        })
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.coordinator = User.objects.create_user(moodleID=9001, password='pass1234')
+        self.chess = Sport.objects.create(name='Chess', category='indoor')
+        self.carrom = Sport.objects.create(name='Carrom', category='indoor')
+        self.chess.secondary.add(self.coordinator)
+        for moodle_id in range(1001, 1006):
+            student = User.objects.create_user(moodleID=moodle_id, password='pass1234')
+            Registration.objects.create(student=student, sport=self.chess, branch='IT')
+            Registration.objects.create(student=student, sport=self.carrom, branch='IT')
+        Registration.objects.create(student=self.coordinator, sport=self.carrom, branch='IT')
+        self.client.force_login(self.coordinator)
+
+    def test_registration_list_pages_cover_everything_once(self):
+        url = reverse('sports:registration-list')
+        unpaged = self.client.get(url).json()
+        # chess registrations plus the coordinator's own carrom entry
+        self.assertEqual(len(unpaged), 6)
+
+        seen, params = [], {'page_size': 4}
+        while True:
+            page = self.client.get(url, params).json()
+            seen.extend(row['id'] for row in page['results'])
+            if page['next'] is None:
+                break
+            params = {'page_size': 4, 'cursor': parse_qs(urlparse(page['next']).query)['cursor'][0]}
+        self.assertEqual(seen, sorted(row['id'] for row in unpaged))
+
+    def test_invalid_cursor_is_404(self):
+        url = reverse('sports:registration-list')
+        for cursor in ('not-a-cursor', KeysetPagination('a', 'b').encode(['2026-13-40T10:00', 1]),
+                       KeysetPagination('a', 'b').encode([{'id__gt': 1}, [1]])):
+            self.assertEqual(self.client.get(url, {'cursor': cursor}).status_code, 404)
+
+
+class LeaderboardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.chess = Sport.objects.create(name='Chess', category='indoor')
+        self.admin = User.objects.create_user(moodleID=9001, password='pass1234', is_staff=True)
+        self.alice = User.objects.create_user(moodleID=1001, password='pass1234')
+        Registration.objects.create(student=self.alice, sport=self.chess, branch='IT')
+        self.url = reverse('sports:sport-leaderboard', args=['chess'])
+
+    def test_etag_and_not_modified(self):
+        first = self.client.get(self.url)
+        etag = first['ETag']
+        with self.assertNumQueries(1):
+            again = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again['ETag'], etag)
+
+    def test_write_paths_invalidate(self):
+        etag = self.client.get(self.url)['ETag']
+        result = Results.objects.get(sport=self.chess)
+
+        self.client.force_login(self.admin)
+        self.client.post(reverse('sports:adjust-result-score', args=[result.id]),
+                         {'action': 'add'}, content_type='application/json')
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()[0]['score'], 1)
+
+        dept = self.client.get(reverse('sports:department-leaderboard'))
+        self.assertEqual(dept.json()['leaderboard'], [])
+        self.client.post(reverse('sports:finalize-sport', args=['chess']))
+        dept = self.client.get(reverse('sports:department-leaderboard'), HTTP_IF_NONE_MATCH=dept['ETag'])
+        self.assertEqual(dept.status_code, 200)
+        self.assertEqual(dept.json()[0]['branch'], 'IT')
+
+
+class LeaderboardPushTests(TestCase):
+    def setUp(self):
+        self.chess = Sport.objects.create(name='Chess', category='indoor')
+        self.admin = User.objects.create_user(moodleID=9001, password='pass1234', is_staff=True)
+        self.alice = User.objects.create_user(moodleID=1001, password='pass1234')
+        Registration.objects.create(student=self.alice, sport=self.chess, branch='IT')
+        self.layer = get_channel_layer()
+        self.channel = async_to_sync(self.layer.new_channel)()
+        async_to_sync(self.layer.group_add)(sport_group(self.chess.pk), self.channel)
+
+    def test_score_adjustment_pushes_delta_on_commit(self):
+        result = Results.objects.get(sport=self.chess)
+        self.client.force_login(self.admin)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.client.post(reverse('sports:adjust-result-score', args=[result.id]),
+                             {'action': 'add'}, content_type='application/json')
+        self.assertEqual(len(callbacks), 1)
+
+        message = async_to_sync(self.layer.receive)(self.channel)
+        self.assertEqual(message['type'], 'leaderboard.delta')
+        self.assertEqual(message['changes'], [
+            {'id': result.id, 'position': 1, 'score': 1, 'points': 10}
+        ])
+
+
+class SnapshotTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.chess = Sport.objects.create(name='Chess', category='indoor')
+        self.admin = User.objects.create_user(moodleID=9001, password='pass1234', is_staff=True)
+        self.alice = User.objects.create_user(moodleID=1001, password='pass1234')
+        Registration.objects.create(student=self.alice, sport=self.chess, branch='IT')
+        self.client.force_login(self.admin)
+
+    def manifest(self):
+        with open(os.path.join(self.root, 'manifest.json')) as f:
+            return json.load(f)
+
+    def read(self, path):
+        with open(os.path.join(self.root, path)) as f:
+            return json.load(f)
+
+    def publish_changes(self, *args):
+        """Run the view, then the background publish it scheduled, in this thread."""
+        with override_settings(LEADERBOARD_SNAPSHOT_ROOT=self.root), \
+                mock.patch('sports.snapshots.threading.Timer') as timer:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(*args)
+            self.assertEqual(timer.call_count, 1)
+            snapshot_publisher.flush()
+
+    def test_standings_change_writes_hashed_blobs(self):
+        self.publish_changes(reverse('sports:finalize-sport', args=['chess']))
+        manifest = self.manifest()
+        sport_path = manifest['sports']['chess']
+        self.assertRegex(sport_path, r'^sport/chess\.[0-9a-f]{16}\.json$')
+        self.assertEqual(self.read(sport_path), self.client.get(reverse('sports:sport-leaderboard', args=['chess'])).json())
+        self.assertEqual(self.read(manifest['department'])[0]['branch'], 'IT')
+
+        self.publish_changes(reverse('sports:unfinalize-sport', args=['chess']))
+        self.assertEqual(self.read(self.manifest()['department'])['leaderboard'], [])
+
+    def test_older_read_never_replaces_the_manifest(self):
+        with override_settings(LEADERBOARD_SNAPSHOT_ROOT=self.root):
+            with mock.patch('sports.snapshots.time.time', return_value=200.0):
+                publish()
+            current = self.manifest()
+            Registration.objects.create(
+                student=User.objects.create_user(moodleID=1002, password='pass1234'), sport=self.chess, branch='MECH'
+            )
+            # a publish that read the standings earlier finishes last
+            with mock.patch('sports.snapshots.time.time', return_value=100.0):
+                publish([self.chess.pk])
+        manifest = self.manifest()
+        self.assertEqual((manifest['sports'], manifest['department']), (current['sports'], current['department']))
+
+    def test_command_requires_root(self):
+        with self.assertRaises(CommandError):
+            call_command('publish_snapshots', stdout=StringIO())
+        with override_settings(LEADERBOARD_SNAPSHOT_ROOT=self.root):
+            call_command('publish_snapshots', stdout=StringIO())
+        self.assertIn('chess', self.manifest()['sports'])
+
+
+class DepartmentStandingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(moodleID=9001, password='pass1234', is_staff=True)
+        self.chess = Sport.objects.create(name='Chess', category='indoor')
+        self.carrom = Sport.objects.create(name='Carrom', category='indoor')
+        for moodle_id, branch in [(1001, 'IT'), (1002, 'COMPS')]:
+            student = User.objects.create_user(moodleID=moodle_id, password='pass1234')
+            Registration.objects.create(student=student, sport=self.chess, branch=branch)
+            Registration.objects.create(student=student, sport=self.carrom, branch=branch)
+        self.client.force_login(self.admin)
+
+    def test_finalize_and_unfinalize_update_breakdowns(self):
+        self.client.post(reverse('sports:finalize-sport', args=['chess']))
+        self.client.post(reverse('sports:finalize-sport', args=['carrom']))
+        it = DepartmentStanding.objects.get(branch='IT')
+        self.assertEqual((it.rank, it.total_points, it.breakdown),
+                         (1, 20, {str(self.chess.pk): 10, str(self.carrom.pk): 10}))
+
+        spectator = Client()
+        with self.assertNumQueries(2):
+            resp = spectator.get(reverse('sports:department-leaderboard'))
+        self.assertEqual([(r['rank'], r['branch'], r['total_points']) for r in resp.json()],
+                         [(1, 'IT', 20), (2, 'COMPS', 10)])
+
+        self.client.post(reverse('sports:unfinalize-sport', args=['chess']))
+        resp = self.client.get(reverse('sports:department-breakdown', args=['comps']))
+        self.assertEqual(resp.data['sports'], [{'sport_slug': 'carrom', 'points': 5}])
+
+    def test_slug_rename_and_direct_saves_keep_standings_current(self):
+        self.client.post(reverse('sports:finalize-sport', args=['chess']))
+        self.chess.refresh_from_db()
+        self.chess.slug = 'chess-open'
+        self.chess.save()
+        self.carrom.is_finalized = True
+        self.carrom.save()  # as the admin does
+        self.assertEqual(DepartmentStanding.objects.get(branch='IT').total_points, 20)
+
+        self.chess.is_finalized = False
+        self.chess.save()
+        resp = self.client.get(reverse('sports:department-breakdown', args=['it']))
+        self.assertEqual((resp.data['total_points'], resp.data['sports']),
+                         (10, [{'sport_slug': 'carrom', 'points': 10}]))
+
+
+class ScoreEventTests(TestCase):
+    def setUp(self):
+        self.chess = Sport.objects.create(name='Chess', category='indoor')
+        self.admin = User.objects.create_user(moodleID=9001, password='pass1234', is_staff=True)
+        for moodle_id in (1001, 1002):
+            student = User.objects.create_user(moodleID=moodle_id, password='pass1234')
+            Registration.objects.create(student=student, sport=self.chess, branch='IT')
+        self.first, self.second = Results.objects.filter(sport=self.chess).order_by('position')
+        self.client.force_login(self.admin)
+        self.url = reverse('sports:record-score-events')
+
+    def post(self, events):
+        return self.client.post(self.url, {'events': events}, content_type='application/json')
+
+    def test_batch_is_applied_once_and_clamped(self):
+        events = [
+            {'result_id': self.first.id, 'delta': 3, 'event_id': 'tab-1'},
+            {'result_id': self.first.id, 'delta': 2, 'event_id': 'tab-2'},
+            {'result_id': self.second.id, 'delta': -4, 'event_id': 'tab-3'},
+        ]
+        resp = self.post(events)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['results'], [
+            {'id': self.first.id, 'score': 5}, {'id': self.second.id, 'score': 0}
+        ])
+
+        retry = self.post(events)
+        self.assertEqual((retry.data['applied'], retry.data['duplicates']), (0, 3))
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.score, 5)
+        self.assertEqual(ScoreEvent.objects.count(), 3)
+
+    def test_finalized_sport_rejects_whole_batch(self):
+        Sport.objects.filter(pk=self.chess.pk).update(is_finalized=True)
+        resp = self.post([{'result_id': self.first.id, 'delta': 1}])
+        self.assertEqual(resp.status_code, 400)
+        self.assertFalse(ScoreEvent.objects.exists())
+
+
+@override_settings(CACHE_IS_SHARED=True)
+class BranchResolverTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.chess = Sport.objects.create(name='Chess', category='indoor')
+        self.alice = User.objects.create_user(moodleID=1001, password='pass1234')
+        self.bob = User.objects.create_user(moodleID=1002, password='pass1234')
+        Registration.objects.create(student=self.alice, sport=self.chess, branch='IT')
+
+    def test_map_is_cached_until_registrations_change(self):
+        self.assertEqual(branch_resolver.resolve(self.chess.id, 1001), 'IT')
+        with self.assertNumQueries(0):
+            self.assertEqual(branch_resolver.resolve_many(self.chess.id, [1001]), {1001: 'IT'})
+
+        Registration.objects.create(student=self.bob, sport=self.chess, branch='MECH')
+        Registration.objects.filter(student=self.alice).update(branch='DS')
+        Registration.objects.get(student=self.alice).save()
+        self.assertEqual(branch_resolver.resolve_many(self.chess.id, [1001, 1002, 1003]),
+                         {1001: 'DS', 1002: 'MECH'})
+
+    def test_player_result_save_takes_branch_from_cache(self):
+        result = Results.objects.get(player=self.alice)
+        result.branch = ''
+        branch_resolver.branches_for(self.chess.id)
+        with self.assertNumQueries(0):
+            calculate_leaderboard_data(Results, result)
+        self.assertEqual(result.branch, 'IT')
+
+    @override_settings(CACHE_IS_SHARED=False)
+    def test_without_shared_cache_changes_apply_at_once(self):
+        self.assertEqual(branch_resolver.resolve(self.chess.id, 1001), 'IT')
+        # changed by another worker: no invalidation reaches this one
+        Registration.objects.filter(student=self.alice).update(branch='DS')
+        self.assertEqual(branch_resolver.resolve(self.chess.id, 1001), 'DS')
+
+
+class RoleResolverTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.chess = Sport.objects.create(name='Chess', category='indoor')
+        self.carrom = Sport.objects.create(name='Carrom', category='indoor')
+        self.coordinator = User.objects.create_user(moodleID=9001, password='pass1234')
+        self.alice = User.objects.create_user(moodleID=1001, password='pass1234')
+        self.registration = Registration.objects.create(student=self.alice, sport=self.chess, branch='IT')
+
+    def test_primary_coordinator_can_manage_registrations(self):
+        self.chess.primary.add(self.coordinator)
+        self.client.force_login(self.coordinator)
+        resp = self.client.get(reverse('sports:registration-by-sport', args=['chess']))
+        self.assertEqual(resp.status_code, 200)
+        resp = self.client.get(reverse('sports:registration-detail', args=[self.registration.id]))
+        self.assertEqual(resp.status_code, 200)
+        resp = self.client.get(reverse('sports:registration-by-sport', args=['carrom']))
+        self.assertEqual(resp.status_code, 403)
+
+    @override_settings(CACHE_IS_SHARED=True)
+    def test_cached_and_invalidated_on_m2m_change(self):
+        self.carrom.secondary.add(self.coordinator)
+        self.assertEqual(role_resolver.coordinated_sport_ids(self.coordinator), {self.carrom.id})
+        with self.assertNumQueries(0):
+            self.assertTrue(role_resolver.is_coordinator(self.coordinator, self.carrom.id))
+
+        self.coordinator.primary_sports.add(self.chess)
+        self.assertEqual(role_resolver.coordinated_sport_ids(self.coordinator), {self.chess.id, self.carrom.id})
+        self.carrom.secondary.clear()
+        self.assertEqual(role_resolver.coordinated_sport_ids(self.coordinator), {self.chess.id})
+        self.chess.delete()
+        self.assertEqual(role_resolver.coordinated_sport_ids(self.coordinator), set())
+
+    @override_settings(CACHE_IS_SHARED=False)
+    def test_without_shared_cache_revocation_is_immediate(self):
+        self.chess.secondary.add(self.coordinator)
+        self.assertTrue(role_resolver.is_coordinator(self.coordinator, self.chess.id))
+        # removed by another worker: m2m_changed never fires here
+        Sport.secondary.through.objects.filter(student=self.coordinator).delete()
+        self.client.force_login(self.coordinator)
+        resp = self.client.get(reverse('sports:registration-by-sport', args=['chess']))
+        self.assertEqual(resp.status_code, 403)
+
+
+@override_settings(CACHE_IS_SHARED=True)
+class RegistrationWindowTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.chess = Sport.objects.create(name='Chess', category='indoor', max_registrations=2)
+        self.alice = User.objects.create_user(moodleID=1001, password='pass1234')
+        self.bob = User.objects.create_user(moodleID=1002, password='pass1234')
+        self.carol = User.objects.create_user(moodleID=1003, password='pass1234')
+        self.url = reverse('sports:registration-list')
+
+    def register(self, user, slug='chess'):
+        self.client.force_login(user)
+        return self.client.post(self.url, {'sport_slug': slug}, content_type='application/json')
+
+    def test_duplicate_and_full_sport_are_rejected(self):
+        self.assertEqual(self.register(self.alice).status_code, 200)
+        resp = self.register(self.alice)
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.json()['error'], "You have already registered for this event.")
+        # the duplicate gave its place back
+        self.assertEqual(self.register(self.bob).status_code, 200)
+
+        self.client.force_login(self.carol)
+        # session and user only: the window and the counter come from the cache
+        with self.assertNumQueries(2):
+            resp = self.client.post(self.url, {'sport_slug': 'chess'}, content_type='application/json')
+        self.assertEqual((resp.status_code, resp.json()['error']), (403, "Registrations for this sport are full."))
+
+        Registration.objects.filter(student=self.alice).delete()
+        self.assertEqual(self.register(self.carol).status_code, 200)
+
+    def test_window_and_global_switch(self):
+        self.chess.registration_closes = timezone.now() - timedelta(hours=1)
+        self.chess.save()
+        resp = self.register(self.alice)
+        self.assertEqual((resp.status_code, resp.json()['error']), (403, "Registrations for this sport are closed."))
+        self.assertEqual(self.register(self.alice, 'curling').status_code, 404)
+
+        self.chess.registration_closes = None
+        self.chess.save()
+        with override_settings(SPORTS_REGISTRATION_OPEN=False):
+            self.assertEqual(self.register(self.alice).status_code, 403)
+        self.assertEqual(self.register(self.alice).status_code, 200)
+
+    def test_sport_missing_from_cached_map_is_loaded(self):
+        self.register(self.alice)
+        # created by another worker: this one's map does not know it
+        Sport.objects.bulk_create([Sport(name='Carrom', slug='carrom', category='indoor')])
+        self.assertEqual(self.register(self.alice, 'carrom').status_code, 200)
+
+    def test_failed_insert_gives_the_place_back(self):
+        self.register(self.alice)
+        with mock.patch.object(Registration.objects, 'create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.register(self.bob)
+        self.assertEqual(self.register(self.carol).status_code, 200)
+
+    @override_settings(CACHE_IS_SHARED=False)
+    def test_without_shared_cache_edits_apply_at_once(self):
+        self.register(self.alice)
+        # an admin edit handled by another worker (no signal reaches this one)
+        Sport.objects.filter(pk=self.chess.pk).update(max_registrations=1)
+        resp = self.register(self.bob)
+        self.assertEqual((resp.status_code, resp.json()['error']), (403, "Registrations for this sport are full."))
+
+
+@override_settings(CACHE_IS_SHARED=True)
+class PointsSchemeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.football = Sport.objects.create(name='Football', isTeamBased=True, category='outdoor')
+        for index, branch in enumerate(['IT', 'COMPS', 'MECH'], start=1):
+            Team.objects.create(name=f'Team {index}', branch=branch, sport=self.football)
+
+    def test_new_entrants_and_scheme_changes_use_the_table(self):
+        points = list(Results.objects.filter(sport=self.football).order_by('position').values_list('points', flat=True))
+        self.assertEqual(points, [20, 10, 0])
+
+        PointsScheme.objects.filter(category='outdoor').update(points=[25, 15, 5])
+        PointsScheme.objects.get(category='outdoor').save()
+        with self.assertNumQueries(4):
+            changed = recompute_sport_points(self.football)
+        self.assertEqual(len(changed), 3)
+        points = list(Results.objects.filter(sport=self.football).order_by('position').values_list('points', flat=True))
+        self.assertEqual(points, [25, 15, 5])
+
+    @override_settings(CACHE_IS_SHARED=False)
+    def test_without_shared_cache_scheme_edits_apply_at_once(self):
+        # edited by another worker: no invalidation reaches this one
+        PointsScheme.objects.filter(category='outdoor').update(points=[30, 20, 10])
+        recompute_sport_points(self.football)
+        points = list(Results.objects.filter(sport=self.football).order_by('position').values_list('points', flat=True))
+        self.assertEqual(points, [30, 20, 10])
+
+
+class RectifyResultsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.chess = Sport.objects.create(name='Chess', category='indoor')
+        for moodle_id in (1001, 1002, 1003):
+            student = User.objects.create_user(moodleID=moodle_id, password='pass1234')
+            Registration.objects.create(student=student, sport=self.chess, branch='AIML')
+        Results.objects.update(branch='', points=0)
+
+    def test_dry_run_then_bulk_fix(self):
+        out = StringIO()
+        call_command('rectify_results', '--dry-run', '--sport', 'chess', stdout=out)
+        self.assertIn('Would update 3 of 3', out.getvalue())
+        self.assertFalse(Results.objects.exclude(branch='').exists())
+
+        call_command('rectify_results', '--chunk-size', '2', stdout=StringIO())
+        rows = Results.objects.order_by('position').values_list('branch', 'points')
+        self.assertEqual(list(rows), [('AIML', 10), ('AIML', 5), ('AIML', 0)])
+
+
+class BracketTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.carrom = Sport.objects.create(name='Carrom', category='indoor')
+        self.admin = User.objects.create_user(moodleID=9001, password='pass1234', is_staff=True)
+        for moodle_id, branch in [(1001, 'IT'), (1002, 'COMPS'), (1003, 'MECH'), (1004, 'DS'), (1005, 'AIML')]:
+            student = User.objects.create_user(moodleID=moodle_id, password='pass1234')
+            Registration.objects.create(student=student, sport=self.carrom, branch=branch)
+        self.entrants = dict(Results.objects.values_list('player_id', 'id'))
+        self.client.force_login(self.admin)
+
+    def record(self, rnd, slot, winner):
+        match = Match.objects.get(sport=self.carrom, round=rnd, slot=slot)
+        return self.client.post(reverse('sports:match-outcome', args=[match.id]),
+                                {'winner': self.entrants[winner]}, content_type='application/json')
+
+    def test_knockout_outcomes_set_positions(self):
+        resp = self.client.post(reverse('sports:sport-bracket', args=['carrom']),
+                                {'format': 'knockout'}, content_type='application/json')
+        self.assertEqual(resp.status_code, 201)
+        # 5 entrants -> 8-draw: seeds 1-3 get byes, 4 v 5 plays in round 1
+        self.assertEqual(len(resp.data), 7)
+
+        self.record(1, 1, 1004)
+        self.record(2, 0, 1001)
+        # mid-tournament nobody holds first place
+        positions = dict(Results.objects.values_list('player_id', 'position'))
+        self.assertEqual(positions, {1001: 2, 1002: 3, 1003: 3, 1004: 3, 1005: 5})
+        self.record(2, 1, 1002)
+        self.assertEqual(self.record(3, 0, 1002).status_code, 200)
+
+        positions = dict(Results.objects.values_list('player_id', 'position'))
+        self.assertEqual(positions, {1001: 2, 1002: 1, 1003: 3, 1004: 3, 1005: 5})
+        self.assertEqual(Results.objects.get(player_id=1002).points, 10)
+
+        # changing a semi-final after the final was played is refused
+        self.assertEqual(self.record(2, 0, 1004).status_code, 400)
+
+    def test_reseed_false_as_a_string_keeps_the_bracket(self):
+        url = reverse('sports:sport-bracket', args=['carrom'])
+        self.client.post(url, {'format': 'knockout'})
+        self.assertEqual(self.client.post(url, {'format': 'knockout', 'reseed': 'false'}).status_code, 400)
+        self.assertEqual(self.client.post(url, {'format': 'round_robin', 'reseed': 'true'}).status_code, 201)
+        self.assertEqual(self.client.post(url, {'format': 'knockout', 'reseed': 'maybe'}).status_code, 400)
+
+    def test_round_robin_ranking_shares_tied_positions(self):
+        matches = [
+            (1, 0, 'a', 'b', 'a', 2, 0, True),
+            (1, 1, 'c', 'd', None, 1, 1, True),
+            (2, 0, 'a', 'c', None, 0, 0, True),
+            (2, 1, 'b', 'd', None, 0, 0, True),
+            (3, 0, 'a', 'd', None, None, None, False),
+        ]
+        self.assertEqual(round_robin_positions(matches), {'a': 1, 'c': 2, 'd': 2, 'b': 4})
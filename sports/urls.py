@@ -27,10 +27,14 @@ urlpatterns = [
 
     # Leaderboard URLS
     path('leaderboard/department/', views.department_leaderboard, name='department-leaderboard'),
+    path('leaderboard/department/<str:branch>/', views.department_breakdown, name='department-breakdown'),
     path('leaderboard/sport/<slug:sport_slug>/', views.sport_leaderboard, name='sport-leaderboard'),
     path('leaderboard/sport/<slug:sport_slug>/update/', views.update_sport_leaderboard,
          name='update-sport-leaderboard'),
     path('leaderboard/result/<int:result_id>/adjust/', views.adjust_result_score, name='adjust-result-score'),
+    path('leaderboard/score-events/', views.record_score_events, name='record-score-events'),
+    path('leaderboard/sport/<slug:sport_slug>/bracket/', views.sport_bracket, name='sport-bracket'),
+    path('matches/<int:match_id>/outcome/', views.match_outcome, name='match-outcome'),
     # ✅ FIXED
     path('leaderboard/sport/<slug:sport_slug>/finalize/', views.finalize_sport_standings, name='finalize-sport'),
     path('leaderboard/sport/<slug:sport_slug>/reset/', views.reset_sport_leaderboard, name='reset-sport-leaderboard'),
@@ -4,18 +4,43 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Sum, Max
+from django.db.models import Q, Max
 from rest_framework.views import APIView
 from authentication.models import Student
-from .models import Sport, Registration, Team, Results, TeamRequest
+from .models import Sport, Registration, Team, Results, TeamRequest, DepartmentStanding, Match
 from .serializers import SportSerializer, RegistrationSerializer, TeamSerializer, TeamCreateSerializer, TeamRequestSerializer
+from .serializers import sport_queryset, list_payload
 from .serializers import (
     ResultsSerializer,
     ResultUpdateSerializer,
     ResultScoreAdjustSerializer,
-    DepartmentLeaderboardSerializer
+    ScoreEventSerializer,
+    MatchSerializer,
+    MatchOutcomeSerializer
 )
-from django.db import transaction
+from django.db import IntegrityError, transaction
+import hashlib
+from django.db.models.functions import Coalesce
+from django.conf import settings
+from .caching import cached_json_response
+from .pagination import KeysetPagination
+from .roles import role_resolver
+from .admission import registration_gate, RegistrationClosed
+from .scoring import apply_score_events, ScoreEventError
+from .points import assign_points
+from .brackets import generate_bracket, record_outcome, clear_outcome, BracketError
+from .leaderboards import sport_standings, department_standings, publish_results, publish_status
+from .signals import standings_changed
+
+
+def paginated_list(request, serializer_class, queryset, paginator):
+    """Serialize ``queryset``, one keyset page at a time when the client asks for pages."""
+    page = paginator.paginate_queryset(queryset, request)
+    rows = queryset if page is None else page
+    payload = list_payload(serializer_class(rows, many=True, context={'request': request}))
+    if page is None:
+        return Response(payload)
+    return paginator.get_paginated_response(payload)
 
 
 # Sport Views
@@ -23,14 +48,14 @@ from django.db import transaction
 @permission_classes([IsAuthenticated])
 def sport_list(request):
     if request.method == 'GET':
-        sports = Sport.objects.all()
-        serializer = SportSerializer(sports, many=True)
+        sports = sport_queryset()
+        serializer = SportSerializer(sports, many=True, context={'request': request})
         return Response(serializer.data)
 
     elif request.method == 'POST':
         serializer = SportSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(primary=request.user)
+            serializer.save(primary=[request.user])
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -44,7 +69,7 @@ def sport_detail(request, pk):
         serializer = SportSerializer(sport)
         return Response(serializer.data)
 
-    if request.user != sport.primary and request.user not in sport.secondary.all():
+    if not role_resolver.is_coordinator(request.user, sport.id):
         return Response(status=status.HTTP_403_FORBIDDEN)
 
     if request.method == 'PUT':
@@ -65,59 +90,47 @@ def sport_detail(request, pk):
 def registration_list(request):
     if request.method == 'GET':
 
-        # Determine if the user is a coordinator/manager
-        coordinated_sports_query = Sport.objects.filter(
-            Q(primary=request.user) | Q(secondary=request.user)
-        )
-
-        # Base: Start by fetching the current user's own registrations
-        user_registrations = Registration.objects.filter(student=request.user)
-
-        if coordinated_sports_query.exists() or request.user.is_staff or request.user.is_superuser:
-            # If manager/admin, combine user's registrations with all registrations they coordinate
-
-            # Get IDs of all registrations related to managed sports
-            managed_registration_ids = Registration.objects.filter(
-                sport__in=coordinated_sports_query
-            ).values_list('id', flat=True)
-
-            # Combine the user's registration IDs with the managed registration IDs
-            all_relevant_ids = set(user_registrations.values_list('id', flat=True)) | set(managed_registration_ids)
+        # Own registrations plus every registration of a sport the user coordinates
+        coordinated_sport_ids = role_resolver.coordinated_sport_ids(request.user)
+        registrations = Registration.objects.filter(
+            Q(student=request.user) | Q(sport_id__in=coordinated_sport_ids)
+        ).select_related('student')
 
-            registrations = Registration.objects.filter(id__in=all_relevant_ids)
-        else:
-            # If regular user, registrations is already set to user_registrations
-            registrations = user_registrations
-
-        serializer = RegistrationSerializer(registrations, many=True, context={'request': request})
-        return Response(serializer.data)
+        return paginated_list(request, RegistrationSerializer, registrations, KeysetPagination('registered_on', 'id'))
 
     elif request.method == 'POST':
-        reg = True   
-        if not reg:
+        if not getattr(settings, 'SPORTS_REGISTRATION_OPEN', True):
             return Response(
             {"error": "Registrations closed"},
             status=status.HTTP_403_FORBIDDEN
             )
 
         serializer = RegistrationSerializer(data=request.data, context={'request': request})
-        sport_slug = request.data.get('sport_slug')
-        sport = get_object_or_404(Sport, slug=sport_slug)
-    
-        # preventing duplicate entry
-        existing_registration = Registration.objects.filter(
-            student=request.user, sport=sport
-        ).first()
-
-        if existing_registration:
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        window = registration_gate.window_for(serializer.validated_data['sport_slug'])
+        if window is None:
+            return Response({"detail": "No Sport matches the given query."}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            registration_gate.admit(window)
+        except RegistrationClosed as exc:
+            return Response({"error": exc.detail}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            with transaction.atomic():
+                serializer.save(sport_id=window.sport_id)
+        except IntegrityError:
+            # unique_together (student, sport)
+            registration_gate.release(window)
             return Response(
                 {"error": "You have already registered for this event."},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        except Exception:
+            registration_gate.release(window)
+            raise
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 @api_view(['GET', 'PUT', 'DELETE'])
@@ -125,9 +138,8 @@ def registration_list(request):
 def registration_detail(request, pk):
     registration = get_object_or_404(Registration, pk=pk)
 
-    if (request.user != registration.student and
-            request.user != registration.sport.primary and
-            request.user not in registration.sport.secondary.all()):
+    if (registration.student_id != request.user.pk and
+            not role_resolver.is_coordinator(request.user, registration.sport_id)):
         return Response(status=status.HTTP_403_FORBIDDEN)
 
     if request.method == 'GET':
@@ -151,16 +163,14 @@ def registration_detail(request, pk):
 @permission_classes([IsAuthenticated])
 def team_list(request):
     if request.method == 'GET':
-        coordinated_sports = Sport.objects.filter(
-            Q(primary=request.user) | Q(secondary=request.user)
-        )
-        if coordinated_sports.exists():
-            teams = Team.objects.filter(sport__in=coordinated_sports)
+        coordinated_sport_ids = role_resolver.coordinated_sport_ids(request.user)
+        if coordinated_sport_ids:
+            teams = Team.objects.filter(sport_id__in=coordinated_sport_ids)
         else:
             teams = Team.objects.filter(members=request.user)
 
-        serializer = TeamSerializer(teams, many=True)
-        return Response(serializer.data)
+        teams = teams.select_related('manager', 'captain').prefetch_related('members')
+        return paginated_list(request, TeamSerializer, teams, KeysetPagination('id'))
 
     elif request.method == 'POST':
         serializer = TeamSerializer(data=request.data, context={'request': request})
@@ -238,9 +248,8 @@ def list_team_requests(request, team_id):
     team = get_object_or_404(Team, pk=team_id)
 
     # Only manager (or admins/coordinators) can view requests
-    is_manager = request.user == team.manager
-    is_coordinator = request.user == team.sport.primary or team.sport.secondary.filter(pk=request.user.pk).exists()
-    if not (is_manager or is_coordinator or request.user.is_staff or request.user.is_superuser):
+    is_manager = team.manager_id == request.user.pk
+    if not (is_manager or role_resolver.can_manage(request.user, team.sport_id)):
         return Response(status=status.HTTP_403_FORBIDDEN)
 
     requests_qs = TeamRequest.objects.filter(team=team, accepted=False, denied=False).order_by('-time')
@@ -282,11 +291,10 @@ def respond_to_request(request, request_id):
 def team_detail(request, pk):
     team = get_object_or_404(Team, pk=pk)
 
-    if (request.user not in team.members.all() and
-            request.user != team.sport.primary and
-            request.user not in team.sport.secondary.all() and
-            request.user != team.manager and
-            request.user != team.captain):
+    is_coordinator = role_resolver.is_coordinator(request.user, team.sport_id)
+    if not (is_coordinator or
+            request.user.pk in (team.manager_id, team.captain_id) or
+            team.members.filter(pk=request.user.pk).exists()):
         return Response(status=status.HTTP_403_FORBIDDEN)
 
     if request.method == 'GET':
@@ -301,9 +309,7 @@ def team_detail(request, pk):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     elif request.method == 'DELETE':
-        if (request.user != team.sport.primary and
-                request.user not in team.sport.secondary.all() and
-                request.user != team.manager):
+        if not (is_coordinator or team.manager_id == request.user.pk):
             return Response(status=status.HTTP_403_FORBIDDEN)
         team.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -315,13 +321,7 @@ def team_detail(request, pk):
 def registration_by_sport(request, sport_slug):
     # --- PERMISSION CHECK ---
     sport = get_object_or_404(Sport, slug=sport_slug)
-    is_coordinator = (
-            request.user == sport.primary or
-            sport.secondary.filter(pk=request.user.pk).exists()
-    )
-    is_admin = request.user.is_staff or request.user.is_superuser
-
-    if not is_coordinator and not is_admin:
+    if not role_resolver.can_manage(request.user, sport.id):
         # If the user is not a coordinator or an admin, deny access.
         return Response(
             {"detail": "Permission denied. You must be a coordinator or admin to view all registrations for a sport."},
@@ -329,9 +329,8 @@ def registration_by_sport(request, sport_slug):
         )
     # --- END PERMISSION CHECK ---
 
-    registrations = Registration.objects.filter(sport=sport)
-    serializer = RegistrationSerializer(registrations, many=True, context={'request': request})
-    return Response(serializer.data)
+    registrations = Registration.objects.filter(sport=sport).select_related('student')
+    return paginated_list(request, RegistrationSerializer, registrations, KeysetPagination('registered_on', 'id'))
 
 
 # Gives a user specefic registration information(self-only)
@@ -340,16 +339,22 @@ def registration_by_sport(request, sport_slug):
 def user_registration_info(request):
     try:
         # NOTE: Your user model should be used directly for filtering
-        registrations = Registration.objects.filter(student=request.user)
+        registrations = Registration.objects.filter(student=request.user).select_related('student')
     except Exception:
         # Added a generic exception handler in case the query fails unexpectedly
         return Response({"error": "Failed to fetch user registrations."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    serializer = RegistrationSerializer(registrations, many=True)
+    serializer = RegistrationSerializer(registrations, many=True, context={'request': request})
+    payload = list_payload(serializer)
+    if isinstance(payload, dict):
+        # side-loaded: {"registrations": [...], "sports": {...}}
+        payload = {"registrations": payload['results'], "sports": payload['sports']}
+    else:
+        payload = {"registrations": payload}
     return Response({
         "username": request.user.username,
         "moodleID": request.user.moodleID,
-        "registrations": serializer.data
+        **payload
     })
 
 
@@ -362,8 +367,8 @@ def admin_registration_search_by_moodle(request, moodleID):
     except Student.DoesNotExist:
         return Response({"error": "Student not found."}, status=404)
 
-    registrations = Registration.objects.filter(student=student)
-    serializer = RegistrationSerializer(registrations, many=True)
+    registrations = Registration.objects.filter(student=student).select_related('student')
+    serializer = RegistrationSerializer(registrations, many=True, context={'request': request})
     return Response({
         "username": student.username,
         "moodleID": student.moodleID,
@@ -377,66 +382,18 @@ def admin_registration_search_by_moodle(request, moodleID):
 @permission_classes([AllowAny])
 def sport_leaderboard(request, sport_slug):
     """
-    Get leaderboard for a specific sport with auto-sync logic.
-    Automatically creates Results entries for any new teams/players.
+    Get leaderboard for a specific sport.
+    Results rows are created when teams/players sign up (see sports.results),
+    so this is a plain read, cached per standings version.
     """
-    sport = get_object_or_404(Sport, slug=sport_slug)
+    sport = get_object_or_404(
+        Sport.objects.annotate(standings_version=Coalesce('leaderboard_version__version', 0)),
+        slug=sport_slug
+    )
 
-    # Auto-sync logic: Add missing teams/players to Results
-    if sport.isTeamBased:
-        # Get all teams for this sport that don't have results yet
-        existing_team_ids = Results.objects.filter(sport=sport).values_list('team_id', flat=True)
-        missing_teams = Team.objects.filter(sport=sport).exclude(id__in=existing_team_ids)
-
-        if missing_teams.exists():
-            # Calculate next position (count existing results + 1)
-            next_position = Results.objects.filter(sport=sport).count() + 1
-
-            # Use get_or_create to avoid race conditions
-            for team in missing_teams:
-                Results.objects.get_or_create(
-                    sport=sport,
-                    team=team,
-                    defaults={
-                        'branch': team.branch,
-                        'position': next_position,
-                        'points': 0,
-                        'score': 0
-                    }
-                )
-                next_position += 1
-    else:
-        # Individual sport - sync with registrations
-        existing_player_ids = Results.objects.filter(sport=sport).values_list('player_id', flat=True)
-        missing_registrations = Registration.objects.filter(
-            sport=sport
-        ).exclude(student_id__in=existing_player_ids).select_related('student')
-
-        if missing_registrations.exists():
-            # Calculate next position
-            next_position = Results.objects.filter(sport=sport).count() + 1
-
-            # Use get_or_create to avoid race conditions
-            for reg in missing_registrations:
-                Results.objects.get_or_create(
-                    sport=sport,
-                    player=reg.student,
-                    defaults={
-                        'branch': reg.branch,
-                        'position': next_position,
-                        'points': 0,
-                        'score': 0
-                    }
-                )
-                next_position += 1
-
-    # ✅ FIX: Sort by position (rank), NOT by score
-    results = Results.objects.filter(
-        sport=sport
-    ).select_related('team', 'player', 'sport').order_by('position')  # ← Changed from order_by('-score')
-
-    serializer = ResultsSerializer(results, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return cached_json_response(
+        request, f'leaderboard:sport:{sport.pk}:v{sport.standings_version}', lambda: sport_standings(sport)
+    )
 
 
 @api_view(['PUT'])
@@ -479,38 +436,21 @@ def update_sport_leaderboard(request, sport_slug):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    # Helper function to calculate department points
-    def calculate_dept_points(position, category):
-        """Calculate department points: 3 for 1st, 2 for 2nd, 1 for 3rd"""
-        if category == 'indoor':
-            if position == 1:
-                return 10
-            elif position == 2:
-                return 5
-            return 0
-        elif category == 'outdoor':
-            if position == 1:
-                return 20
-            elif position == 2:
-                return 10
-            return 0
-        else:
-            return "Incorrect category"
-
     try:
         with transaction.atomic():
             # Fetch results to update
             results_to_update = list(
                 Results.objects.filter(id__in=result_ids, sport=sport).select_for_update()
             )
-            # Update positions and recalculate points
+            # Update positions and recalculate points from the sport's PointsScheme
             for result in results_to_update:
-                new_position = rank_updates[result.id]
-                result.position = new_position
-                result.points = calculate_dept_points(new_position, result.sport.category)
+                result.position = rank_updates[result.id]
+            assign_points(results_to_update)
 
             # Bulk update for better performance
             Results.objects.bulk_update(results_to_update, ['position', 'points'])
+            standings_changed.send(sender=Sport, sport_id=sport.pk)
+            publish_results(sport, results_to_update)
 
         # Return updated results
         updated_results = Results.objects.filter(
@@ -563,16 +503,20 @@ def adjust_result_score(request, result_id):
                 {"error": "Score has reached maximum limit"},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        result.score += 1
     elif action == 'subtract':
         if result.score <= 0:
             return Response(
                 {"error": "Score cannot be negative"},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        result.score -= 1
 
-    result.save()
+    # atomic F() update; the checks above only give a friendly error
+    try:
+        (result,), _ = apply_score_events(
+            [{'result_id': result.id, 'delta': 1 if action == 'add' else -1}], user=request.user
+        )
+    except ScoreEventError as e:
+        return Response({"error": e.detail}, status=status.HTTP_400_BAD_REQUEST)
 
     return Response(
         {
@@ -584,6 +528,98 @@ def adjust_result_score(request, result_id):
     )
 
 
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def record_score_events(request):
+    """
+    Apply a batch of score deltas.
+    Expects: {"events": [{"result_id": 1, "delta": 2, "event_id": "tablet-3:17"}, ...]}
+    """
+    events = request.data.get('events') if isinstance(request.data, dict) else None
+    if not isinstance(events, list) or not events:
+        return Response({"error": "events must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+    max_batch = getattr(settings, 'SCORE_EVENTS_MAX_BATCH', 200)
+    if len(events) > max_batch:
+        return Response({"error": f"At most {max_batch} events per request."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = ScoreEventSerializer(data=events, many=True)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        results, duplicates = apply_score_events(serializer.validated_data, user=request.user)
+    except ScoreEventError as e:
+        return Response({"error": e.detail}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(
+        {
+            'results': [{'id': r.id, 'score': r.score} for r in results],
+            'applied': len(events) - duplicates,
+            'duplicates': duplicates,
+        },
+        status=status.HTTP_200_OK
+    )
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([AllowAny])
+def sport_bracket(request, sport_slug):
+    """
+    GET: the sport's fixtures. POST (admin): generate the bracket from its entrants.
+    Expects: {"format": "knockout" | "round_robin", "reseed": false}
+    """
+    sport = get_object_or_404(Sport, slug=sport_slug)
+
+    if request.method == 'POST':
+        if not (request.user.is_authenticated and request.user.is_staff):
+            return Response(status=status.HTTP_403_FORBIDDEN)
+        fmt = request.data.get('format')
+        if fmt not in dict(Match.FORMAT_CHOICES):
+            return Response({"error": "format must be 'knockout' or 'round_robin'."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        # form and query payloads send "false"/"0" as strings
+        reseed = serializers.BooleanField().to_internal_value(request.data.get('reseed', False))
+        try:
+            generate_bracket(sport, fmt, reseed=reseed)
+        except BracketError as e:
+            return Response({"error": e.detail}, status=status.HTTP_400_BAD_REQUEST)
+
+    matches = Match.objects.filter(sport=sport).select_related('home__team', 'home__player', 'away__team', 'away__player')
+    serializer = MatchSerializer(matches, many=True)
+    code = status.HTTP_201_CREATED if request.method == 'POST' else status.HTTP_200_OK
+    return Response(serializer.data, status=code)
+
+
+@api_view(['POST', 'DELETE'])
+@permission_classes([IsAdminUser])
+def match_outcome(request, match_id):
+    """
+    POST: record a match outcome and update standings.
+    Expects: {"winner": <result id or null for a draw>, "home_score": 3, "away_score": 1}
+    DELETE: clear a recorded outcome.
+    """
+    match = get_object_or_404(Match.objects.select_related('sport'), pk=match_id)
+
+    try:
+        if request.method == 'DELETE':
+            match = clear_outcome(match)
+        else:
+            serializer = MatchOutcomeSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            match = record_outcome(
+                match,
+                winner_id=serializer.validated_data.get('winner'),
+                home_score=serializer.validated_data.get('home_score'),
+                away_score=serializer.validated_data.get('away_score'),
+            )
+    except BracketError as e:
+        return Response({"error": e.detail}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(MatchSerializer(match).data, status=status.HTTP_200_OK)
+
+
 @api_view(['POST'])
 @permission_classes([IsAdminUser])
 def finalize_sport_standings(request, sport_slug):
@@ -610,7 +646,8 @@ def finalize_sport_standings(request, sport_slug):
     try:
         with transaction.atomic():
             sport.is_finalized = True
-            sport.save()
+            sport.save()  # sends standings_changed (sports.signals)
+            publish_status(sport)
 
         return Response(
             {
@@ -634,42 +671,47 @@ def department_leaderboard(request):
     """
     Get overall department leaderboard aggregated from all finalized sports.
     Only counts points from sports that have been finalized.
+    Reads the pre-ranked DepartmentStanding table, cached under the set of
+    finalized sports and their standings versions.
     """
     # Get all finalized sports
-    finalized_sport_ids = Sport.objects.filter(is_finalized=True).values_list('id', flat=True)
+    finalized = list(
+        Sport.objects.filter(is_finalized=True).order_by('id').values_list('id', 'leaderboard_version__version')
+    )
+    finalized_sport_ids = [sport_id for sport_id, _ in finalized]
+    state = hashlib.md5(repr(finalized).encode()).hexdigest()
 
-    if not finalized_sport_ids:
-        return Response(
-            {
+    def build():
+        if not finalized_sport_ids:
+            return {
                 "message": "No sports have been finalized yet.",
                 "leaderboard": []
-            },
-            status=status.HTTP_200_OK
-        )
+            }
+        return department_standings()
+
+    return cached_json_response(request, f'leaderboard:department:{state}', build)
+
 
-    # Aggregate points by branch
-    leaderboard_data = Results.objects.filter(
-        sport_id__in=finalized_sport_ids,
-        branch__isnull=False
-    ).values('branch').annotate(
-        total_points=Sum('points')
-    ).order_by('-total_points')
-
-    # Add rank to each entry
-    formatted_data = []
-    current_rank = 1
-    for entry in leaderboard_data:
-        if entry['branch']:  # Skip null branches
-            formatted_data.append({
-                "rank": current_rank,
-                "branch": entry['branch'],
-                "total_points": entry['total_points'] or 0
-            })
-            current_rank += 1
-
-    # Use serializer for consistent output
-    serializer = DepartmentLeaderboardSerializer(formatted_data, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def department_breakdown(request, branch):
+    """
+    Points a department earned in each finalized sport.
+    """
+    standing = get_object_or_404(DepartmentStanding, branch=branch.upper())
+    slugs = dict(Sport.objects.filter(pk__in=standing.breakdown).values_list('id', 'slug'))
+    sports = sorted(
+        ((slugs[int(sport_id)], points) for sport_id, points in standing.breakdown.items()
+         if int(sport_id) in slugs),
+        key=lambda item: (-item[1], item[0])
+    )
+    return Response({
+        "rank": standing.rank,
+        "branch": standing.branch,
+        "branch_display": standing.get_branch_display(),
+        "total_points": standing.total_points,
+        "sports": [{"sport_slug": slug, "points": points} for slug, points in sports],
+    }, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
@@ -697,10 +739,12 @@ def reset_sport_leaderboard(request, sport_slug):
             for index, result in enumerate(results, start=1):
                 result.position = index
                 result.score = 0
-                result.points = 0  # Will be recalculated by signal if position is 1-3
+            assign_points(results)
 
             # Bulk update
             Results.objects.bulk_update(results, ['position', 'score', 'points'])
+            standings_changed.send(sender=Sport, sport_id=sport.pk)
+            publish_results(sport, results)
 
         return Response(
             {
@@ -734,7 +778,8 @@ def unfinalize_sport_standings(request, sport_slug):
     try:
         with transaction.atomic():
             sport.is_finalized = False
-            sport.save()
+            sport.save()  # sends standings_changed (sports.signals)
+            publish_status(sport)
 
         return Response(
             {